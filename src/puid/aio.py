@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor
+
+#  Entropy sources may block, so `puid`s for asyncio are generated ahead of demand in an executor,
+#  which is also where the entropy source is called. Popping a `puid` only waits on the executor
+#  when the buffer runs dry.
+#
+#  Once the buffer is at or below the low watermark, a single refill tops it up to the high
+#  watermark in the background.
+
+
+class Prefetcher:
+
+    def __init__(
+        self,
+        generate_many: Callable[[int], list[str]],
+        low_watermark: int,
+        high_watermark: int,
+        executor: Executor | None,
+    ) -> None:
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError("watermarks must satisfy 0 <= low_watermark < high_watermark")
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self._generate_many = generate_many
+        self._executor = executor
+        self._ids: deque[str] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._refill: asyncio.Future[list[str]] | None = None
+
+    async def get(self) -> str:
+        if len(self._ids) <= self.low_watermark:
+            refill = self._start_refill()
+            while not self._ids:
+                # The refill is shared, so cancelling one waiter must not cancel it for the others
+                await asyncio.shield(refill)
+                refill = self._start_refill()
+        return self._ids.popleft()
+
+    async def stream(self, n: int | None = None) -> AsyncIterator[str]:
+        while n is None or 0 < n:
+            yield await self.get()
+            if n is not None:
+                n -= 1
+
+    def _start_refill(self) -> asyncio.Future[list[str]]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A refill in flight belongs to the previous loop
+            self._loop = loop
+            self._refill = None
+
+        if self._refill is None:
+            n_ids = self.high_watermark - len(self._ids)
+            self._refill = loop.run_in_executor(self._executor, self._generate_many, n_ids)
+            self._refill.add_done_callback(self._refilled)
+        return self._refill
+
+    def _refilled(self, refill: asyncio.Future[list[str]]) -> None:
+        if self._refill is refill:
+            self._refill = None
+        # An exception is raised by awaiting the refill, if anything is waiting for it
+        if not refill.cancelled() and refill.exception() is None:
+            self._ids.extend(refill.result())
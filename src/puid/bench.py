@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Sequence
+from importlib import metadata
+from typing import Any
+
+from puid.chars import Charsets
+from puid.puid import Backend, Puid, Strategy
+
+#  Benchmarks of every charset, engine and generation API.
+#
+#  Each case reports the throughput of the best of its timed runs, the entropy bytes consumed per
+#  puid, and the peak memory traced per puid while generating, which includes the puids themselves.
+
+BITWIDTHS = (64, 128, 256)
+# Number of puids measured for entropy and memory
+TRACED_COUNT = 1000
+CUSTOM_CHARS = {
+    'custom': 'dingosky',
+    'unicode': 'dîngøsky☺⚡✓→€£¥',
+}
+
+
+@dc.dataclass(slots=True)
+class Case:
+    name: str
+    charset: Charsets | str
+    bitwidth: float
+    backend: Backend
+    strategy: Strategy
+    mode: str
+
+
+def engines() -> list[tuple[Backend, Strategy]]:
+    try:
+        import numpy   # noqa: F401
+    except ImportError:
+        return [("python", "bits"), ("python", "integer")]
+    return [("python", "bits"), ("python", "integer"), ("numpy", "bits")]
+
+
+def cases(bitwidths=BITWIDTHS) -> list[Case]:
+    charsets: list[tuple[str, Charsets | str]] = [
+        (charset.name, charset) for charset in Charsets if charset != Charsets.CUSTOM
+    ]
+    charsets += CUSTOM_CHARS.items()
+    return [
+        Case(name, charset, bitwidth, backend, strategy, mode)
+        for name, charset in charsets
+        for bitwidth in bitwidths
+        for backend, strategy in engines()
+        for mode in ("generate", "generate_many", "generate_many_ints")
+    ]
+
+
+def generated(rand_id: Puid, mode: str, count: int) -> list[str] | list[int]:
+    match mode:
+        case "generate":
+            return [rand_id.generate() for _ in range(count)]
+        case "generate_many":
+            return rand_id.generate_many(count)
+        case "generate_int":
+            return [rand_id.generate_int() for _ in range(count)]
+        case "generate_many_ints":
+            return rand_id.generate_many_ints(count)
+        case other:
+            raise ValueError(f"unknown mode: {other!r}")
+
+
+def entropy_bytes_per_id(case: Case, count: int) -> float:
+    # Consumption is the same for every generation API of strings, and of integers. Without read
+    # ahead, the NumPy backend slices little more entropy than its puids use.
+    rand_id = Puid(bitwidth=case.bitwidth,
+                   charset=case.charset,
+                   backend=case.backend,
+                   strategy=case.strategy,
+                   buffer_size=1,
+                   track_stats=True)
+    generated(rand_id, "generate_int" if case.mode.endswith("ints") else "generate", count)
+    return rand_id.stats().bits_sliced / (8 * count)
+
+
+def run_case(case: Case, count: int, repeat: int = 3) -> dict[str, Any]:
+    """
+    Benchmark a case
+
+    :param case: Case to benchmark
+    :param count: Number of `puid`s generated per timed run
+    :param repeat: Number of timed runs
+    :return dict of results
+    """
+    rand_id = Puid(bitwidth=case.bitwidth,
+                   charset=case.charset,
+                   backend=case.backend,
+                   strategy=case.strategy)
+    # Warm up the reservoir and any lazily built state
+    rand_id.generate()
+
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generated(rand_id, case.mode, count)
+        elapsed.append(time.perf_counter() - start)
+
+    # Tracing slows generation down several times, so fewer puids are traced and measured
+    n_traced = min(count, TRACED_COUNT)
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        generated(rand_id, case.mode, n_traced)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(elapsed)
+    return {
+        'charset': case.name,
+        'bitwidth': case.bitwidth,
+        'backend': case.backend,
+        'strategy': case.strategy,
+        'mode': case.mode,
+        'len': len(rand_id),
+        'ids_per_sec': count / best,
+        'ns_per_id': 1e9 * best / count,
+        'entropy_bytes_per_id': entropy_bytes_per_id(case, n_traced),
+        'peak_bytes_per_id': (peak - baseline) / n_traced,
+    }
+
+
+def import_times(module: str = 'puid', preload: Sequence[str] = ()) -> dict[str, int]:
+    """
+    Cumulative import time of module, and of every module imported with it, in a fresh interpreter
+
+    :param module: Module to import
+    :param preload: Modules imported before module, so not counted in its import time
+    :return dict of import time in microseconds, by module name
+    """
+    code = ''.join(f'import {name}; ' for name in preload) + f'import {module}'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(count: int = 10_000, repeat: int = 3, bitwidths=BITWIDTHS) -> dict[str, Any]:
+    """
+    Benchmark every case, with the environment needed to compare runs
+
+    :param count: Number of `puid`s generated per timed run
+    :param repeat: Number of timed runs per case
+    :param bitwidths: Bitwidths of the cases
+    :return dict of environment and results
+    """
+    try:
+        version = metadata.version('puid')
+    except metadata.PackageNotFoundError:
+        version = None
+
+    return {
+        'puid': version,
+        'python': sys.version,
+        'platform': platform.platform(),
+        'count': count,
+        'repeat': repeat,
+        'import_us': import_times()['puid'],
+        'results': [run_case(case, count, repeat) for case in cases(bitwidths)],
+    }
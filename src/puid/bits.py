@@ -1,4 +1,16 @@
-from math import ceil, floor, log2
+import functools
+from math import ceil, log2
+
+from puid.puid_error import EntropyError
+
+# Entropy bytes read ahead, so many puids are served by each call to the entropy source
+DEFAULT_BUFFER_LEN = 1 << 12
+
+# Upper bound on the entropy buffer grown for batch generation
+MAX_BUFFER_LEN = 1 << 16
+
+# Bytes of the reservoir loaded into an int at a time, from which successive values are sliced
+WORD_LEN = 16
 
 #  Create array of minimum bits required to determine if a value is less than n_chars
 #  Array elements are of the form (n, bits): For values less than n, bits bits are required
@@ -34,108 +46,113 @@ def bit_shifts(n_chars):
     return [base_shift] + [shift(bit) for bit in range(2, n_bits_per_char) if is_bit_zero(bit)]
 
 
-def fill_entropy(entropy_offset, entropy_bytes, entropy_fn):
-    n_bytes = len(entropy_bytes)
-    n_bits = 8 * n_bytes
+@functools.lru_cache(maxsize=None)
+def value_shifts(n_chars):
+    # Bits consumed after slicing each possible value: all bits for an accepted value, otherwise the
+    # minimal bits necessary to determine the value is not acceptable, as per `bit_shifts`
+    n_bits_per_char = ceil(log2(n_chars))
+    shifts = bit_shifts(n_chars)
 
-    if entropy_offset == n_bits:
-        # no carry
-        entropy_bytes[0:n_bytes] = entropy_fn(n_bytes)
-    else:
-        offset_byte_num = floor(entropy_offset / 8)
+    def shift(value):
+        if value < n_chars:
+            return n_bits_per_char
+        if len(shifts) == 1:
+            return shifts[0][1]
+        return next(bits for max_value, bits in shifts if value <= max_value)
 
-        # Move unused bytes to the left
-        entropy_bytes[0:n_bytes - offset_byte_num] = entropy_bytes[offset_byte_num:n_bytes]
+    return tuple(shift(value) for value in range(1 << n_bits_per_char))
 
-        # Fill right bytes with new random values
-        entropy_bytes[n_bytes - offset_byte_num:n_bytes] = entropy_fn(offset_byte_num)
 
+def fill_entropy(entropy_offset, entropy_bytes, entropy_fn, buffer_len):
+    # Drop the consumed bytes, then top up the reservoir to buffer_len bytes in a single read.
+    # Deleting from the front of a bytearray does not move the remaining bytes.
+    del entropy_bytes[:entropy_offset >> 3]
+    entropy_bytes += entropy_fn(buffer_len - len(entropy_bytes))
     return entropy_offset % 8
 
 
-def value_at(l_offset, n_bits, bytes):
-    l_byte_ndx = floor(l_offset / 8)
-    l_byte = bytes[l_byte_ndx]
-
-    l_bit_num = l_offset % 8
-
-    if l_bit_num + n_bits <= 8:
-        return ((l_byte << l_bit_num) & 0xFF) >> (8 - n_bits)
-
-    r_byte = bytes[l_byte_ndx + 1]
-    r_bit_num = l_bit_num + n_bits - 8
-
-    l_value = ((l_byte << l_bit_num) & 0xFF) >> (l_bit_num - r_bit_num)
-    r_value = r_byte >> (8 - r_bit_num)
-
-    return l_value + r_value
-
-
-def muncher(n_chars, puid_len, entropy_fn):
+def muncher(n_chars, puid_len, entropy_fn, buffer_len=DEFAULT_BUFFER_LEN, stats=None):
     n_bits_per_char = ceil(log2(n_chars))
     n_bits_per_puid = n_bits_per_char * puid_len
     n_bytes_per_puid = ceil(n_bits_per_puid / 8)
 
-    buffer_len = n_bytes_per_puid + 1
-    n_entropy_bits = 8 * buffer_len
-    entropy_offset = n_entropy_bits
-    entropy_bytes = bytearray(buffer_len)
-
-    def sliced_value():
-        nonlocal entropy_offset
-        if n_entropy_bits < entropy_offset + n_bits_per_char:
-            entropy_offset = fill_entropy(
-                entropy_offset,
-                entropy_bytes,
-                entropy_fn,
-            )
-        return value_at(entropy_offset, n_bits_per_char, entropy_bytes)
-
-    # Checks if n_chars is a power of two
-    if n_chars.bit_count() == 1:
-        #  When chars count is a power of 2, sliced bits always yield a valid value
-        def bits_muncher():
-
-            def slice_value():
-                nonlocal entropy_offset
-                value = sliced_value()
-                entropy_offset += n_bits_per_char
-                return value
-
-            puid = [slice_value() for _ in range(puid_len)]
-            return puid
-
-        return bits_muncher
-
-    shifts = bit_shifts(n_chars)
-
-    def accept_value(value):
-        # Value is valid if it is less than the number of characters
-        if value < n_chars:
-            return (True, n_bits_per_char)
-
-        # For invalid value, shift the minimal bits necessary to determine validity
-        # If only one item, no need to search
-        if len(shifts) == 1:
-            return (False, shifts[0][1])
-
-        bit_shift = [bs for bs in shifts if value <= bs[0]]
-        return (False, bit_shift[0][1])
-
-    def slice_value():
+    # The reservoir holds at least one puid, plus a byte for bits left over from the previous one
+    min_buffer_len = max(buffer_len, n_bytes_per_puid + 1)
+    fill_len = min_buffer_len
+    n_entropy_bits = 0
+    entropy_offset = 0
+    entropy_bytes = bytearray()
+    # Bits of the bytes dropped from the reservoir, all of them sliced
+    n_dropped_bits = 0
+
+    def reserve(n_puids):
+        # Read enough entropy for a batch of puids in a few large reads
+        nonlocal fill_len
+        fill_len = max(min(n_bytes_per_puid * n_puids + 1, MAX_BUFFER_LEN), min_buffer_len)
+
+    def fill(offset):
+        # Returns the offset of the first unused bit after refilling the reservoir
+        nonlocal n_entropy_bits, n_dropped_bits, entropy_offset
+        if stats is not None:
+            stats.bits_carried += n_entropy_bits - offset
+        n_dropped_bits += 8 * (offset >> 3)
+        offset = fill_entropy(offset, entropy_bytes, entropy_fn, fill_len)
+        n_entropy_bits = 8 * len(entropy_bytes)
+        if n_entropy_bits < offset + n_bits_per_char:
+            # Keep the state consistent with the refilled reservoir
+            entropy_offset = offset
+            raise EntropyError('entropy source is exhausted')
+        return offset
+
+    def counted(bits_muncher):
+        # Stats are counted per call, keeping the slicing loops untouched
+        if stats is None:
+            return bits_muncher
+
+        n_counted_bits = 0
+
+        def counted_muncher(n_puids=1):
+            nonlocal n_counted_bits
+            values = bits_muncher(n_puids)
+            n_sliced_bits = n_dropped_bits + entropy_offset
+            stats.bits_sliced += n_sliced_bits - n_counted_bits
+            n_counted_bits = n_sliced_bits
+            return values
+
+        return counted_muncher
+
+    # Bits consumed by slicing each value. A rejected value only consumes the minimal bits
+    # necessary to determine that it is not less than n_chars
+    shifts = value_shifts(n_chars)
+    value_mask = (1 << n_bits_per_char) - 1
+
+    def bits_muncher(n_puids=1):
         nonlocal entropy_offset
-        value = sliced_value()
-        accept, shift = accept_value(value)
-        # Returned shift is the minimal bits necessary to determine if slice value is valid
-        entropy_offset += shift
-
-        if accept:
-            return value
-
-        # If value not acceptable, slice another
-        return slice_value()
-
-    def bits_muncher():
-        return [slice_value() for _ in range(puid_len)]
-
-    return bits_muncher
+        if 1 < n_puids:
+            reserve(n_puids)
+
+        # Slice values in a flat loop over locals, rather than nested calls per character. Values
+        # are shifted and masked out of a word of bits [word_offset - 8 * WORD_LEN, word_offset)
+        values = []
+        append = values.append
+        offset = entropy_offset
+        word = 0
+        word_offset = 0
+        n_values = puid_len * n_puids
+        while n_values:
+            if word_offset < offset + n_bits_per_char:
+                if n_entropy_bits < offset + n_bits_per_char:
+                    offset = fill(offset)
+                byte_ndx = offset >> 3
+                word_bytes = entropy_bytes[byte_ndx:byte_ndx + WORD_LEN]
+                word = int.from_bytes(word_bytes, 'big')
+                word_offset = 8 * (byte_ndx + len(word_bytes))
+            value = (word >> (word_offset - offset - n_bits_per_char)) & value_mask
+            offset += shifts[value]
+            if value < n_chars:
+                append(value)
+                n_values -= 1
+        entropy_offset = offset
+        return values
+
+    return counted(bits_muncher)
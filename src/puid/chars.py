@@ -3,8 +3,7 @@ from __future__ import annotations
 import dataclasses as dc
 import string
 from enum import Enum
-from collections.abc import Iterable
-from ordered_set import OrderedSet
+from collections.abc import Collection, Iterable
 from .chars_error import InvalidChars, NonUniqueChars, LengthOutOfBounds
 
 
@@ -18,7 +17,7 @@ def CharsetMeta(type):
 class Charset:
     kind: Charsets
     characters: str
-    _inner_set: OrderedSet[str] = dc.field(repr=False)
+    _inner_set: frozenset[str] = dc.field(repr=False)
 
     def __len__(self) -> int:
         return len(self.characters)
@@ -28,7 +27,7 @@ class Charset:
 
     @classmethod
     def predefined(cls, kind: Charsets) -> Charset:
-        charset = OrderedSet(kind.value)
+        charset = frozenset(kind.value)
         if len(kind.value) != len(charset):
             raise NonUniqueChars("repeating characters on the given charset str")
         instance = cls.__new__(cls)
@@ -42,7 +41,7 @@ class Charset:
 
     @classmethod
     def custom(cls, characters: str) -> Charset:
-        charset = OrderedSet(characters)
+        charset = frozenset(characters)
         if len(characters) != len(charset):
             raise NonUniqueChars("repeating characters on the given charset str")
         is_valid_charset(charset)
@@ -56,10 +55,10 @@ class Charset:
         return instance
 
     def contains_charset(self, value: str) -> bool:
-        return len(set(value) - self._inner_set) == 0
+        return self._inner_set.issuperset(value)
 
 
-def is_valid_charset(chars: OrderedSet[str]) -> bool:
+def is_valid_charset(chars: Collection[str]) -> bool:
     min_len = 2
     max_len = 256
 
@@ -1,20 +1,127 @@
+import enum
+import json
 import sys
+import time
 
 try:
     import funparse.api as fa
 except ImportError as error:
     error.add_note(
         "Did you forget to install this package with the 'cli' extra?")
+    raise
 
-from .chars import Charsets, Charset
+from .chars import Charsets
 from .puid import Puid
+from .puid_error import BitsError, TotalRiskError
+
+# Number of puids generated, formatted and written at a time
+BATCH_LEN = 1 << 14
+WRITE_BUFFER_LEN = 1 << 20
+
+
+class Format(enum.Enum):
+    PLAIN = enum.auto()
+    CSV = enum.auto()
+    JSONL = enum.auto()
+    PG_COPY = enum.auto()
+
+
+def line_format(format: Format, characters: str) -> tuple[str, str, str]:
+    """
+    Line format of `puid`s made of characters
+
+    Valid characters exclude quotes, backslashes, whitespace and control characters, so `puid`s are
+    never escaped. Only CSV quotes `puid`s, when characters include a comma.
+
+    :param format: Output format
+    :param characters: Characters `puid`s are made of
+    :return (header, prefix, suffix) of the lines
+    """
+    match format:
+        case Format.PLAIN | Format.PG_COPY:
+            return '', '', ''
+        case Format.CSV if ',' in characters:
+            return 'id\n', '"', '"'
+        case Format.CSV:
+            return 'id\n', '', ''
+        case Format.JSONL:
+            return '', '{"id": "', '"}'
+
+
+def write_ids(rand_id: Puid, count: int, format: Format, file) -> None:
+    header, prefix, suffix = line_format(format, rand_id.charset.characters)
+    separator = suffix + '\n' + prefix
+
+    file.write(header)
+    while 0 < count:
+        ids = rand_id.generate_many(min(count, BATCH_LEN))
+        # One join per batch, rather than formatting each line
+        file.write(prefix + separator.join(ids) + suffix + '\n')
+        count -= len(ids)
+
+
+@fa.as_arg_parser
+def cli(
+    total: int | None = None,
+    risk: float | None = None,
+    bits: float | None = None,
+    charset: Charsets = Charsets.SAFE64,
+    chars: str | None = None,
+    count: int = 1,
+    output: str = '-',
+    format: Format = Format.PLAIN,
+    rate: bool = False,
+) -> None:
+    """
+    Generate `puid`s of the entropy given by either total and risk, or bits (default 128 bits).
+    --chars takes custom characters, overriding --charset. --output '-' writes to stdout, and --rate
+    reports the `puid`s generated per second on stderr.
+    """
+    characters: Charsets | str = chars if chars is not None else charset
+    if bits is not None:
+        if total is not None or risk is not None:
+            raise BitsError("bits specified with total/risk")
+        rand_id = Puid(bitwidth=bits, charset=characters)
+    elif total is not None and risk is not None:
+        rand_id = Puid.from_risk(total=total, risk=risk, charset=characters)
+    elif total is None and risk is None:
+        rand_id = Puid(charset=characters)
+    else:
+        raise TotalRiskError("total and risk must both be specified")
+
+    start = time.perf_counter()
+    if output == '-':
+        write_ids(rand_id, count, format, sys.stdout)
+        sys.stdout.flush()
+    else:
+        with open(output, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_LEN) as file:
+            write_ids(rand_id, count, format, file)
+    elapsed = time.perf_counter() - start
+
+    if rate:
+        print(f"{count:,} puids in {elapsed:.3f}s ({count / elapsed:,.0f} puids/sec)",
+              file=sys.stderr)
 
 
 @fa.as_arg_parser
-def cli(total: int, risk: float, charset: Charsets = Charsets.SAFE64) -> str:
-    return Puid.from_risk(total=total, risk=risk, charset=charset).generate()
+def bench(count: int = 10_000, repeat: int = 3, output: str = '-') -> None:
+    """
+    Benchmark every charset, engine and generation API, writing the results as JSON.
+    --output '-' writes to stdout.
+    """
+    from .bench import run
+    results = json.dumps(run(count=count, repeat=repeat), indent=2)
+    if output == '-':
+        print(results)
+    else:
+        with open(output, 'w', encoding='utf-8') as file:
+            print(results, file=file)
 
 
 def main(argv=sys.argv) -> int:
-    print(cli.run(sys.argv[1:]))
+    match argv[1:2]:
+        case ['bench']:
+            bench.run(argv[2:])
+        case _:
+            cli.run(argv[1:])
     return 0
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import re
+import sys
+from collections.abc import Sequence
+
+from puid.encoder import CharsTable, chars_table
+from puid.pow2 import unpack_bits
+from puid.puid_error import InvalidPuid
+
+#  A `puid` of puid_len characters stands for an integer in [0, n_chars ** puid_len), written in
+#  base n_chars with the characters as digits, most significant first. The bytes form of a `puid`
+#  is that integer, big-endian, in the fewest bytes that hold every value.
+
+# Reverse table entry of bytes that are not ASCII characters
+NOT_A_CHAR = 0xFF
+# Reverse table entry of the newlines delimiting `puid`s in a buffer
+NEWLINE = 0xFE
+DIGITS = b'0123456789abcdefghijklmnopqrstuvwxyz'
+# Fewest values of a power of 2 charset worth unpacking in bulk, as unpacking has a setup cost
+UNPACK_MIN_LEN = 16
+# Bases int() parses and format() writes in C
+FORMAT_SPECS = {2: 'b', 8: 'o', 10: 'd', 16: 'x'}
+# bytes.translate tables of codes to base 36 digits, and back
+CODE_DIGITS = DIGITS.ljust(256, b'\0')
+DIGIT_CODES = bytes(DIGITS.find(byte) % 256 for byte in range(256))
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Codec:
+    """
+    Conversion of `puid`s to and from the integers, and bytes, they stand for
+    """
+    n_chars: int
+    puid_len: int
+    # Length of the bytes form
+    n_bytes: int
+    table: CharsTable
+    # Reverse table: bytes.translate table of ASCII characters to codes, else a dict
+    codes_table: bytes | dict[str, int]
+    # Reverse table of newline delimited ASCII `puid`s, which keeps newlines apart
+    lines_table: bytes | None
+    # Matches strings of the characters, so non-ASCII `puid`s are checked in C
+    chars_pattern: re.Pattern[str]
+
+    @property
+    def n_values(self) -> int:
+        return self.n_chars**self.puid_len
+
+    def codes(self, values: Sequence[int]) -> bytes:
+        """
+        Character codes of integers, `puid_len` per integer
+
+        :param values: Integers in [0, `n_values`)
+        :return bytes
+        """
+        n_chars = self.n_chars
+        puid_len = self.puid_len
+        if n_chars in FORMAT_SPECS and self._in_str_digits():
+            spec = f'0{puid_len}{FORMAT_SPECS[n_chars]}'
+            digits = ''.join([format(value, spec) for value in values]).encode('ascii')
+            return digits.translate(DIGIT_CODES)
+
+        if n_chars.bit_count() == 1 and UNPACK_MIN_LEN <= len(values):
+            # Each value is shifted up to whole chunks of 8 codes, which are unpacked all at once.
+            # The zero codes padding each value are then dropped, a column at a time.
+            n_bits = n_chars.bit_length() - 1
+            n_padded = 8 * ((puid_len + 7) // 8)
+            n_value_bytes = n_padded * n_bits // 8
+            shift = (n_padded - puid_len) * n_bits
+            padded = unpack_bits(
+                b''.join([(value << shift).to_bytes(n_value_bytes, 'big') for value in values]),
+                n_bits)
+            if n_padded == puid_len:
+                return padded
+            codes = bytearray(len(padded) // n_padded * puid_len)
+            for ndx in range(puid_len):
+                codes[ndx::puid_len] = padded[ndx::n_padded]
+            return bytes(codes)
+
+        codes = bytearray()
+        if n_chars.bit_count() == 1:
+            n_bits = n_chars.bit_length() - 1
+            mask = n_chars - 1
+            shifts = range(n_bits * (puid_len - 1), -1, -n_bits)
+            for value in values:
+                codes += bytes([(value >> shift) & mask for shift in shifts])
+            return bytes(codes)
+
+        value_codes = bytearray(puid_len)
+        for value in values:
+            for ndx in range(puid_len - 1, -1, -1):
+                value, value_codes[ndx] = divmod(value, n_chars)
+            codes += value_codes
+        return bytes(codes)
+
+    def _in_str_digits(self) -> bool:
+        # CPython limits the digits of int to str conversions, in bases other than powers of 2
+        max_digits = sys.get_int_max_str_digits()
+        return self.n_chars.bit_count() == 1 or not max_digits or self.puid_len <= max_digits
+
+    def encode(self, value: int | bytes) -> str:
+        """
+        `puid` standing for an integer, or for its bytes form
+
+        :param value: Integer in [0, `n_values`), or `n_bytes` big-endian bytes of one
+        :return str
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            if len(value) != self.n_bytes:
+                raise ValueError(f"expected {self.n_bytes} bytes, got {len(value)}")
+            value = int.from_bytes(value, 'big')
+        if not 0 <= value < self.n_values:
+            raise ValueError("value out of range of the puids")
+        return self.table.encode(self.codes((value, )))
+
+    def decode_int(self, puid: str) -> int:
+        """
+        Integer a `puid` stands for
+
+        :param puid: `puid` of `puid_len` characters
+        :return int
+        """
+        codes = self.decode_codes(puid)
+        if self.n_chars <= len(DIGITS) and self._in_str_digits():
+            return int(codes.translate(CODE_DIGITS), self.n_chars)
+
+        n_chars = self.n_chars
+        value = 0
+        for code in codes:
+            value = value * n_chars + code
+        return value
+
+    def decode_bytes(self, puid: str) -> bytes:
+        """
+        Bytes form of a `puid`
+
+        :param puid: `puid` of `puid_len` characters
+        :return bytes
+        """
+        return self.decode_int(puid).to_bytes(self.n_bytes, 'big')
+
+    def decode_codes(self, puid: str) -> bytes:
+        """
+        Character codes of a `puid`
+
+        :param puid: `puid` of `puid_len` characters
+        :return bytes
+        """
+        if len(puid) != self.puid_len:
+            raise InvalidPuid(f"expected {self.puid_len} characters, got {len(puid)}")
+
+        if isinstance(self.codes_table, bytes):
+            # ASCII codes are below 128, so NOT_A_CHAR never stands for a character
+            try:
+                codes = puid.encode('ascii').translate(self.codes_table)
+            except UnicodeEncodeError:
+                codes = bytes([NOT_A_CHAR])
+            if NOT_A_CHAR in codes:
+                raise InvalidPuid("puid has characters outside its charset")
+            return codes
+
+        # Codes of 256 characters take every byte, so missing characters are marked by -1
+        char_codes = [self.codes_table.get(char, -1) for char in puid]
+        if -1 in char_codes:
+            raise InvalidPuid("puid has characters outside its charset")
+        return bytes(char_codes)
+
+    def is_valid(self, puid: str) -> bool:
+        """
+        Whether a `puid` has `puid_len` characters, all of them in the charset
+
+        :param puid: `puid` to check
+        :return bool
+        """
+        if len(puid) != self.puid_len:
+            return False
+        codes_table = self.codes_table
+        if isinstance(codes_table, bytes):
+            return puid.isascii() and NOT_A_CHAR not in puid.encode('ascii').translate(codes_table)
+        return self.chars_pattern.fullmatch(puid) is not None
+
+    def valid_mask(self, puids: Sequence[str] | bytes | bytearray | memoryview) -> list[bool]:
+        """
+        Whether each of many `puid`s is valid, as `is_valid`
+
+        ASCII `puid`s are checked all at once, in C, when joined by newlines. Only `puid`s of
+        other charsets are checked one by one.
+
+        :param puids: `puid`s, or a buffer of newline delimited UTF-8 `puid`s. A final newline
+            ends the last `puid`
+        :return list[bool], a flag per `puid`
+        """
+        if isinstance(puids, (bytes, bytearray, memoryview)):
+            lines = bytes(puids)
+            if not lines:
+                return []
+            if lines.endswith(b'\n'):
+                lines = lines[:-1]
+            n_puids = lines.count(b'\n') + 1
+            if self.lines_table is None:
+                # Bytes that are not UTF-8 decode to lone surrogates, which are never characters
+                text = lines.decode('utf-8', 'surrogateescape')
+                return [self.is_valid(puid) for puid in text.split('\n')]
+            return self._valid_lines(lines, n_puids)
+
+        n_puids = len(puids)
+        if not n_puids:
+            return []
+        joined = '\n'.join(puids)
+        if self.lines_table is None or not joined.isascii() or joined.count('\n') != n_puids - 1:
+            # Non-ASCII characters or newlines within puids, which the joined puids cannot tell
+            return [self.is_valid(puid) for puid in puids]
+        return self._valid_lines(joined.encode('ascii'), n_puids)
+
+    def _valid_lines(self, lines: bytes, n_puids: int) -> list[bool]:
+        # Flags of n_puids ASCII puids joined by the n_puids - 1 newlines in lines
+        puid_len = self.puid_len
+        stride = puid_len + 1
+        codes = lines.translate(self.lines_table)
+
+        mask = [True] * n_puids
+        if len(lines) == n_puids * stride - 1 and \
+                lines[puid_len::stride].count(b'\n') == n_puids - 1:
+            # Every puid has the right length, so only puids with invalid characters are visited
+            offset = codes.find(NOT_A_CHAR)
+            while 0 <= offset:
+                ndx = offset // stride
+                mask[ndx] = False
+                offset = codes.find(NOT_A_CHAR, (ndx + 1) * stride)
+            return mask
+
+        start = 0
+        for ndx in range(n_puids):
+            end = lines.find(b'\n', start)
+            if end < 0:
+                end = len(lines)
+            mask[ndx] = end - start == puid_len and codes.find(NOT_A_CHAR, start, end) < 0
+            start = end + 1
+        return mask
+
+
+def codec(characters: str, puid_len: int) -> Codec:
+    """
+    Codec of `puid`s of puid_len characters
+
+    :param characters: Characters of the `puid`s
+    :param puid_len: Number of characters in a `puid`
+    :return Codec
+    """
+    n_chars = len(characters)
+    codes_table: bytes | dict[str, int]
+    lines_table = None
+    if characters.isascii():
+        table = bytearray([NOT_A_CHAR]) * 256
+        for code, char in enumerate(characters.encode('ascii')):
+            table[char] = code
+        codes_table = bytes(table)
+        table[ord('\n')] = NEWLINE
+        lines_table = bytes(table)
+    else:
+        codes_table = {char: code for code, char in enumerate(characters)}
+
+    return Codec(
+        n_chars=n_chars,
+        puid_len=puid_len,
+        n_bytes=((n_chars**puid_len - 1).bit_length() + 7) // 8,
+        table=chars_table(characters),
+        codes_table=codes_table,
+        lines_table=lines_table,
+        chars_pattern=re.compile(f'[{re.escape(characters)}]*'),
+    )
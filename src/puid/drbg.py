@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import weakref
+
+#  Entropy source of a deterministic random bit generator (DRBG), seeded once and expanded in C.
+#
+#  A secret key is expanded by SHAKE-256 of the key and a block counter into a block of output
+#  bytes, in a single call. The last KEY_LEN bytes of each block replace the key and are never
+#  returned, so bytes already returned cannot be recovered from the state (fast key erasure).
+#  Requests for entropy are sliced from the current block, so `os.urandom` is called only to seed,
+#  and to reseed after every `reseed_interval` bytes.
+#
+#  A fixed seed is never reseeded, so it returns the same bytes on every run.
+#
+#  A forked child would return the same bytes as its parent and siblings, so every DRBG seeded from
+#  the OS is reseeded in the child. A DRBG with a fixed seed is left to repeat, as seeded.
+
+KEY_LEN = 32
+# Bytes of output expanded per call to SHAKE-256
+DEFAULT_BLOCK_LEN = 1 << 16
+# Bytes of output after which a DRBG seeded from the OS mixes in fresh OS entropy
+DEFAULT_RESEED_INTERVAL = 1 << 30
+# Bytes returned for a request of None bytes, as `secrets.token_bytes` does
+DEFAULT_N_BYTES = 32
+
+SEED_DOMAIN = b'puid.drbg.seed'
+RESEED_DOMAIN = b'puid.drbg.reseed'
+
+
+class Drbg:
+    """
+    Entropy source expanding a seed with SHAKE-256, for use as a `Puid` `entropy_source`
+
+    Instances are callable like `os.urandom`, and may be shared by threads.
+    """
+    __slots__ = ('block_len', 'reseed_interval', 'seeded', '_key', '_counter', '_block', '_offset',
+                 '_n_since_seed', '_lock', '__weakref__')
+
+    def __init__(
+        self,
+        seed: bytes | int | None = None,
+        block_len: int = DEFAULT_BLOCK_LEN,
+        reseed_interval: int = DEFAULT_RESEED_INTERVAL,
+    ) -> None:
+        """
+        :param seed: Fixed seed for output reproduced by the same seed and block_len, or None to
+            seed from `os.urandom`
+        :param block_len: Bytes of output expanded at a time
+        :param reseed_interval: Bytes of output between reseeds from `os.urandom`, unless seeded
+        """
+        if block_len <= 0:
+            raise ValueError("block_len must be a positive integer")
+        if reseed_interval <= 0:
+            raise ValueError("reseed_interval must be a positive integer")
+        self.block_len = block_len
+        self.reseed_interval = reseed_interval
+        # Whether the output is fixed by a given seed
+        self.seeded = seed is not None
+        self._lock = threading.Lock()
+
+        if isinstance(seed, int):
+            seed = seed.to_bytes((seed.bit_length() + 8) // 8, 'big', signed=True)
+        self._key = hashlib.shake_256(SEED_DOMAIN + (seed if seed is not None else os.urandom(
+            KEY_LEN))).digest(KEY_LEN)
+        self._counter = 0
+        self._block = b''
+        self._offset = 0
+        self._n_since_seed = 0
+        _drbgs.add(self)
+
+    def __call__(self, n_bytes: int | None = None) -> bytes:
+        """
+        Random bytes
+
+        :param n_bytes: Number of bytes, defaults to DEFAULT_N_BYTES
+        :return bytes
+        """
+        n_bytes = DEFAULT_N_BYTES if n_bytes is None else n_bytes
+        if n_bytes < 0:
+            raise ValueError("negative number of bytes")
+        with self._lock:
+            offset = self._offset
+            if offset + n_bytes <= len(self._block):
+                self._offset = offset + n_bytes
+                return self._block[offset:offset + n_bytes]
+
+            parts = [self._block[offset:]]
+            n_needed = n_bytes - len(parts[0])
+            while n_needed:
+                self._expand()
+                part = self._block[:n_needed]
+                self._offset = len(part)
+                parts.append(part)
+                n_needed -= len(part)
+            return b''.join(parts)
+
+    def reseed(self, entropy: bytes | None = None) -> None:
+        """
+        Mix fresh entropy into the key, and discard the bytes expanded from the previous key
+
+        :param entropy: Entropy to mix in, defaults to bytes from `os.urandom`
+        """
+        entropy = os.urandom(KEY_LEN) if entropy is None else entropy
+        with self._lock:
+            self._mix(entropy)
+            self._block = b''
+            self._offset = 0
+
+    def _mix(self, entropy: bytes) -> None:
+        self._key = hashlib.shake_256(RESEED_DOMAIN + self._key + entropy).digest(KEY_LEN)
+        self._n_since_seed = 0
+
+    def _expand(self) -> None:
+        # Called with the lock held
+        if not self.seeded and self.reseed_interval <= self._n_since_seed:
+            self._mix(os.urandom(KEY_LEN))
+
+        block = hashlib.shake_256(self._key + self._counter.to_bytes(8, 'big')).digest(
+            self.block_len + KEY_LEN)
+        self._key = block[-KEY_LEN:]
+        self._block = block[:-KEY_LEN]
+        self._offset = 0
+        self._counter = (self._counter + 1) & ((1 << 64) - 1)
+        self._n_since_seed += self.block_len
+
+
+# DRBGs of this process, reseeded in forked children
+_drbgs: weakref.WeakSet[Drbg] = weakref.WeakSet()
+
+
+def _reseed_after_fork() -> None:
+    for drbg in _drbgs:
+        # The lock may have been held by a thread of the parent, which the child lacks
+        drbg._lock = threading.Lock()
+        if not drbg.seeded:
+            drbg.reseed()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
@@ -1,60 +1,87 @@
 from __future__ import annotations
 
+import dataclasses as dc
+import functools
+import importlib
 import typing
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 from puid.chars import Charsets, Charset
-from puid.encoders.alpha import alpha
-from puid.encoders.alpha import alpha_lower
-from puid.encoders.alpha import alpha_upper
-from puid.encoders.alphanum import alphanum
-from puid.encoders.alphanum import alphanum_lower
-from puid.encoders.alphanum import alphanum_upper
-from puid.encoders.base16 import base16
-from puid.encoders.base32 import base32
-from puid.encoders.base32 import base32_hex
-from puid.encoders.base32 import base32_hex_upper
-from puid.encoders.crockford32 import crockford32
-from puid.encoders.decimal import decimal
-from puid.encoders.hex import hex_lower
-from puid.encoders.hex import hex_upper
-from puid.encoders.safe32 import safe32
-from puid.encoders.safe64 import safe64
-from puid.encoders.safe_ascii import safe_ascii
-from puid.encoders.symbol import symbol
-from puid.encoders.word_safe32 import word_safe32
-
-from puid.encoders.custom import custom
 
 Encoder = Callable[[int], int]
 EncoderFactory = Callable[[], Encoder]
 
-_ENCODERS: dict[Charsets, EncoderFactory] = {
-    Charsets.ALPHA: alpha,
-    Charsets.ALPHA_LOWER: alpha_lower,
-    Charsets.ALPHA_UPPER: alpha_upper,
-    Charsets.ALPHANUM: alphanum,
-    Charsets.ALPHANUM_LOWER: alphanum_lower,
-    Charsets.ALPHANUM_UPPER: alphanum_upper,
-    Charsets.BASE16: base16,
-    Charsets.BASE32: base32,
-    Charsets.BASE32_HEX: base32_hex,
-    Charsets.BASE32_HEX_UPPER: base32_hex_upper,
-    Charsets.CROCKFORD32: crockford32,
-    Charsets.DECIMAL: decimal,
-    Charsets.HEX: hex_lower,
-    Charsets.HEX_UPPER: hex_upper,
-    Charsets.SAFE32: safe32,
-    Charsets.SAFE64: safe64,
-    Charsets.SAFE_ASCII: safe_ascii,
-    Charsets.SYMBOL: symbol,
-    Charsets.WORD_SAFE32: word_safe32,
+# Module and factory of each predefined encoder, imported on first use of its charset
+_ENCODERS: dict[Charsets, tuple[str, str]] = {
+    Charsets.ALPHA: ('alpha', 'alpha'),
+    Charsets.ALPHA_LOWER: ('alpha', 'alpha_lower'),
+    Charsets.ALPHA_UPPER: ('alpha', 'alpha_upper'),
+    Charsets.ALPHANUM: ('alphanum', 'alphanum'),
+    Charsets.ALPHANUM_LOWER: ('alphanum', 'alphanum_lower'),
+    Charsets.ALPHANUM_UPPER: ('alphanum', 'alphanum_upper'),
+    Charsets.BASE16: ('base16', 'base16'),
+    Charsets.BASE32: ('base32', 'base32'),
+    Charsets.BASE32_HEX: ('base32', 'base32_hex'),
+    Charsets.BASE32_HEX_UPPER: ('base32', 'base32_hex_upper'),
+    Charsets.CROCKFORD32: ('crockford32', 'crockford32'),
+    Charsets.DECIMAL: ('decimal', 'decimal'),
+    Charsets.HEX: ('hex', 'hex_lower'),
+    Charsets.HEX_UPPER: ('hex', 'hex_upper'),
+    Charsets.SAFE32: ('safe32', 'safe32'),
+    Charsets.SAFE64: ('safe64', 'safe64'),
+    Charsets.SAFE_ASCII: ('safe_ascii', 'safe_ascii'),
+    Charsets.SYMBOL: ('symbol', 'symbol'),
+    Charsets.WORD_SAFE32: ('word_safe32', 'word_safe32'),
 }
 
 
 def get_encoder(charset: Charset) -> Encoder:
     match charset.kind:
         case Charsets.CUSTOM:
+            from puid.encoders.custom import custom
             return custom(charset.characters)
         case other:
-            return _ENCODERS[other]()
+            module_name, factory_name = _ENCODERS[other]
+            module = importlib.import_module(f'puid.encoders.{module_name}')
+            return getattr(module, factory_name)()
+
+
+@dc.dataclass(frozen=True, slots=True)
+class CharsTable:
+    """
+    Lookup tables compiled once per set of characters, used to encode whole sequences of slice
+    values with a single C-level call instead of one encoder call per character
+    """
+
+    chars: str   # str table: value -> character
+    utf8: tuple[bytes, ...]   # bytes table: value -> UTF-8 encoded character
+    translation: bytes | dict[int, str]   # bytes.translate table if ASCII, else str.translate map
+
+    @property
+    def is_ascii(self) -> bool:
+        return isinstance(self.translation, bytes)
+
+    def encode(self, values: Iterable[int]) -> str:
+        if isinstance(self.translation, bytes):
+            return bytes(values).translate(self.translation).decode('ascii')
+        return bytes(values).decode('latin-1').translate(self.translation)
+
+    def encode_utf8(self, values: Iterable[int]) -> bytes:
+        if isinstance(self.translation, bytes):
+            return bytes(values).translate(self.translation)
+        return self.encode(values).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=128)
+def chars_table(characters: str) -> CharsTable:
+    translation: bytes | dict[int, str]
+    if characters.isascii():
+        translation = characters.encode('ascii').ljust(256, b'\0')
+    else:
+        translation = dict(enumerate(characters))
+
+    return CharsTable(
+        chars=characters,
+        utf8=tuple(char.encode('utf-8') for char in characters),
+        translation=translation,
+    )
@@ -1,9 +1,35 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import time
+from collections.abc import Iterable
 from math import ceil, log2, trunc
+from typing import TYPE_CHECKING, Any, Literal
 
-from puid.chars import Charset
+from puid.chars import Charset, Charsets
 from puid.chars_error import InvalidChars
+from puid.integer import integer_draw
+from puid.plan import plan
 from puid.puid_error import TotalRiskError
 
+if TYPE_CHECKING:
+    from puid.puid import Puid, Strategy
+
+# Birthday trials run by `simulate_risk` by default
+DEFAULT_TRIALS = 1_000_000
+# Upper bound on the integers sampled and sorted at a time by `simulate_risk`
+SIMULATION_BLOCK_LEN = 1 << 22
+
+# Number of puids timed per candidate by `rank_charsets` when ranking by speed
+DEFAULT_MEASURE_COUNT = 10_000
+
+# What `rank_charsets` ranks candidates by, ties broken in the order listed
+RankBy = Literal["len", "bytes", "entropy", "speed"]
+
+# Where `simulate_risk` draws the integers of `puid`s from: NumPy's generator, uniform over the
+# same integers, or the `Puid` itself
+Sampler = Literal["numpy", "puid"]
+
 
 def bits_for_total_risk(total: int, risk: float) -> float:
     """
@@ -29,6 +55,257 @@ def bits_for_total_risk(total: int, risk: float) -> float:
         return 2 * log2(total) + log2(risk) - 1
 
 
+def risk_for_bits_total(bits: Any, total: Any) -> Any:
+    """
+    Risk of repeat, as 1 in `risk`, among `total` `puid`s of `bits` of entropy. Inverse of
+    `bits_for_total_risk`, counting the exact total * (total - 1) / 2 pairs of `puid`s
+
+    :param bits: float, or NumPy array of float
+    :param total: int, or NumPy array of int
+    :return float, or NumPy array of float
+
+    >>> round(risk_for_bits_total(36.86024885932352, 500))
+    1000000
+    """
+    if isinstance(total, (int, float)):
+        if total < 0:
+            raise TotalRiskError('total must be non-negative')
+        if total <= 1:
+            # No pairs of puids, so never a repeat
+            return float('inf')
+    return 2.0**(bits + 1) / (total * (total - 1))
+
+
+def total_for_bits_risk(bits: Any, risk: Any) -> Any:
+    """
+    Total `puid`s of `bits` of entropy with the given `risk` of repeat, as 1 in `risk`. Inverse of
+    `bits_for_total_risk`
+
+    :param bits: float, or NumPy array of float
+    :param risk: float, or NumPy array of float
+    :return float, or NumPy array of float
+
+    >>> round(total_for_bits_risk(36.86024885932352, 1e6))
+    500
+    """
+    if isinstance(risk, (int, float)) and risk <= 0:
+        raise TotalRiskError('risk must be positive')
+    # The positive root of total * (total - 1) = 2 ** (bits + 1) / risk
+    return (1 + (1 + 4 * 2.0**(bits + 1) / risk)**0.5) / 2
+
+
+def expected_repeats(bits: Any, rate: Any, period: Any) -> Any:
+    """
+    Expected number of repeated pairs among the `puid`s of `bits` of entropy generated at `rate`
+    over `period`, in the same unit of time
+
+    :param bits: float, or NumPy array of float
+    :param rate: `puid`s per unit of time, or NumPy array of them
+    :param period: Units of time, or NumPy array of them
+    :return float, or NumPy array of float
+
+    >>> expected_repeats(64, 1000, 365 * 24 * 3600)
+    26.956499531694075
+    """
+    total = rate * period
+    return total * (total - 1) / 2.0**(bits + 1)
+
+
+def simulate_risk(
+    rand_id: Puid,
+    total: Any,
+    trials: int = DEFAULT_TRIALS,
+    seed: int | None = None,
+    sampler: Sampler = "numpy",
+) -> Any:
+    """
+    Risk of repeat, as 1 in `risk`, found by running birthday trials: each draws `total` `puid`s
+    of `rand_id`, and repeats if any two are equal. Trials are sampled and sorted in blocks with
+    NumPy, which must be installed
+
+    `rand_id` must have at most 2**64 `puid`s, so that repeats are frequent enough to be found. The
+    risk is the inverse of the chance of any repeat, which `risk_for_bits_total` approximates by the
+    expected repeats. Once repeats are likely, the simulated risk is the higher.
+
+    :param rand_id: `Puid` to simulate
+    :param total: Number of `puid`s per trial, or NumPy array of them
+    :param trials: Number of trials per total
+    :param seed: Seed of NumPy's generator, for reproducible runs
+    :param sampler: "numpy" to sample integers uniformly with NumPy, which checks the risk of
+        `rand_id`'s number of `puid`s alone, or "puid" to generate `puid`s with `rand_id` as
+        `generate_many` does, which also checks its entropy source and engine but is far slower
+    :return float, inf if no trial repeats, or NumPy array of float
+    """
+    try:
+        import numpy as np
+    except ImportError as error:
+        error.add_note("Did you forget to install this package with the 'numpy' extra?")
+        raise
+
+    n_values = rand_id.codec.n_values
+    if 1 << 64 < n_values:
+        raise ValueError("simulate_risk requires puids of at most 64 bits")
+    if trials <= 0:
+        raise ValueError("trials must be a positive integer")
+
+    match sampler:
+        case "numpy":
+            rng = np.random.default_rng(seed)
+
+            def sample(n_trials, n_puids):
+                return rng.integers(0, n_values, size=(n_trials, n_puids), dtype=np.uint64)
+        case "puid":
+
+            def sample(n_trials, n_puids):
+                # The puids themselves are sorted, as fixed width strings
+                puids = rand_id.generate_many(n_trials * n_puids)
+                return np.array(puids, dtype=f'U{len(rand_id)}').reshape(n_trials, n_puids)
+        case other:
+            raise ValueError(f"unsupported sampler: {other!r}")
+
+    def risk(n_puids):
+        n_puids = int(n_puids)
+        if n_puids < 2:
+            return float('inf')
+        n_repeats = 0
+        block_trials = max(1, SIMULATION_BLOCK_LEN // n_puids)
+        for start in range(0, trials, block_trials):
+            values = np.sort(sample(min(block_trials, trials - start), n_puids), axis=1)
+            n_repeats += int((values[:, 1:] == values[:, :-1]).any(axis=1).sum())
+        return trials / n_repeats if n_repeats else float('inf')
+
+    if np.ndim(total) == 0:
+        return risk(total)
+    return np.vectorize(risk, otypes=[float])(total)
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Candidate:
+    """
+    A charset and strategy for `puid`s of a target entropy, with the costs of their `puid`s
+    """
+    charset: Charsets | str
+    strategy: Strategy
+    # Target bits of entropy
+    bits: float
+    len: int
+    # Bits of entropy of each `puid`, at least the target bits
+    bitwidth: float
+    # Average UTF-8 bytes of each `puid`
+    utf8_bytes: float
+    # Expected bytes of entropy consumed per `puid`, including rejected values
+    entropy_bytes: float
+    # Measured generation time per `puid`, if measured
+    ns_per_id: float | None = None
+
+    def puid(self, **kwargs: Any) -> Puid:
+        """
+        `Puid` of this candidate
+
+        :param kwargs: Further `Puid` options, such as `entropy_source` or `backend`
+        :return Puid
+        """
+        from puid.puid import Puid
+        return Puid(bitwidth=self.bits, charset=self.charset, strategy=self.strategy, **kwargs)
+
+
+def rank_charsets(
+    total: int,
+    risk: float,
+    charsets: Iterable[Charsets | str] | None = None,
+    rank_by: RankBy = "bytes",
+    strategies: Iterable[Strategy] = ("bits", "integer"),
+    measure: int | None = None,
+) -> list[Candidate]:
+    """
+    Candidate charsets and strategies for `total` `puid`s with the given `risk` of repeat, best
+    first
+
+    :param total: Number of `puid`s
+    :param risk: Risk of repeat, as 1 in `risk`
+    :param charsets: Predefined `Charsets` members or custom characters, defaults to every
+        predefined charset
+    :param rank_by: "len" for the fewest characters, "bytes" for the fewest UTF-8 bytes, "entropy"
+        for the fewest entropy bytes consumed, or "speed" for the fastest generation
+    :param strategies: Strategies of each charset to rank
+    :param measure: Number of `puid`s timed per candidate, defaults to DEFAULT_MEASURE_COUNT when
+        ranking by speed, and to none otherwise
+    :return list[Candidate]
+    """
+    bits = bits_for_total_risk(total, risk)
+    if charsets is None:
+        charsets = [charset for charset in Charsets if charset != Charsets.CUSTOM]
+    if measure is None:
+        measure = DEFAULT_MEASURE_COUNT if rank_by == "speed" else 0
+
+    candidates = []
+    for charset in charsets:
+        for strategy in strategies:
+            candidate = _candidate(charset, strategy, bits)
+            if 0 < measure:
+                candidate = dc.replace(candidate, ns_per_id=_time_per_id(candidate, measure))
+            candidates.append(candidate)
+
+    keys = {
+        "len": lambda candidate: candidate.len,
+        "bytes": lambda candidate: candidate.utf8_bytes,
+        "entropy": lambda candidate: candidate.entropy_bytes,
+        "speed": lambda candidate: candidate.ns_per_id or 0.0,
+    }
+    order = [rank_by] + [key for key in keys if key != rank_by]
+    return sorted(candidates, key=lambda candidate: [keys[key](candidate) for key in order])
+
+
+def plan_puid(
+    total: int,
+    risk: float,
+    charsets: Iterable[Charsets | str] | None = None,
+    rank_by: RankBy = "bytes",
+    **kwargs: Any,
+) -> Puid:
+    """
+    `Puid` of the best candidate of `rank_charsets`
+
+    :param total: Number of `puid`s
+    :param risk: Risk of repeat, as 1 in `risk`
+    :param charsets: Predefined `Charsets` members or custom characters, defaults to every
+        predefined charset
+    :param rank_by: What candidates are ranked by, as for `rank_charsets`
+    :param kwargs: Further `Puid` options, such as `entropy_source` or `backend`
+    :return Puid
+    """
+    return rank_charsets(total, risk, charsets, rank_by)[0].puid(**kwargs)
+
+
+def _candidate(charset: Charsets | str, strategy: Strategy, bits: float) -> Candidate:
+    puid_plan = plan(charset, bits)
+    n_chars = len(puid_plan.characters)
+    if strategy == "integer":
+        n_bits, limit = integer_draw(n_chars, puid_plan.puid_len)
+        entropy_bits = n_bits * (1 << n_bits) / limit
+    else:
+        # Slices take shifts[value] bits each, and only n_chars of the values are accepted
+        entropy_bits = puid_plan.puid_len * sum(puid_plan.shifts) / n_chars
+
+    return Candidate(
+        charset=charset,
+        strategy=strategy,
+        bits=bits,
+        len=puid_plan.puid_len,
+        bitwidth=puid_plan.bitwidth,
+        utf8_bytes=puid_plan.puid_len * len(puid_plan.characters.encode('utf-8')) / n_chars,
+        entropy_bytes=entropy_bits / 8,
+    )
+
+
+def _time_per_id(candidate: Candidate, count: int) -> float:
+    rand_id = candidate.puid()
+    rand_id.generate()
+    start = time.perf_counter()
+    rand_id.generate_many(count)
+    return 1e9 * (time.perf_counter() - start) / count
+
+
 def bits_per_char(chars: Charset) -> float:
     """
     Entropy bits per character for either a predefined Chars enum or a string of characters
@@ -0,0 +1,98 @@
+import functools
+from math import ceil
+
+from puid.bits import DEFAULT_BUFFER_LEN, MAX_BUFFER_LEN
+from puid.puid_error import EntropyError
+
+# Bytes of the reservoir moved at a time into the int pool integers are drawn from
+POOL_LEN = 64
+
+#  Whole-integer sampling: rather than slicing and rejecting each character, a `puid` is a single
+#  uniform integer in [0, n_chars ** puid_len), written in base n_chars by `Codec`.
+#
+#  Each integer is drawn from n bits of entropy. Draws below the largest multiple of
+#  n_chars ** puid_len that fits in n bits are accepted and reduced modulo n_chars ** puid_len, so
+#  every `puid` is equally likely. The rest are rejected whole. As only whole integers are rejected,
+#  a `puid` takes close to log2(n_chars) bits per character, rather than ceil(log2(n_chars)) bits
+#  per sliced value plus the bits of rejected values.
+
+
+@functools.lru_cache(maxsize=1024)
+def integer_draw(n_chars, puid_len):
+    """
+    Bits drawn per integer, and the limit below which a draw is accepted
+
+    Drawing a few more bits than the integer needs is chosen when it lowers the expected bits per
+    `puid`, as fewer draws are then rejected
+
+    :param n_chars: Number of characters
+    :param puid_len: Number of characters in a `puid`
+    :return (n_bits, limit)
+    """
+    n_values = n_chars**puid_len
+    min_bits = (n_values - 1).bit_length()
+
+    def limit(n_bits):
+        return ((1 << n_bits) // n_values) * n_values
+
+    def expected_bits(n_bits):
+        return n_bits * (1 << n_bits) / limit(n_bits)
+
+    n_bits = min(range(min_bits, min_bits + 8), key=expected_bits)
+    return n_bits, limit(n_bits)
+
+
+def integer_muncher(n_chars, puid_len, entropy_fn, buffer_len=DEFAULT_BUFFER_LEN, stats=None):
+    n_values = n_chars**puid_len
+    n_bits, limit = integer_draw(n_chars, puid_len)
+    mask = (1 << n_bits) - 1
+    n_bytes = ceil(n_bits / 8)
+    read_len = max(buffer_len, n_bytes)
+
+    entropy = b''
+    entropy_offset = 0
+    # Integers are drawn from the low bits of the pool, and reservoir bytes are added above them
+    pool = 0
+    n_pool_bits = 0
+
+    def refill(n_needed):
+        nonlocal entropy, entropy_offset
+        carry = entropy[entropy_offset:]
+        if stats is not None:
+            stats.bits_carried += 8 * len(carry)
+        n_read = max(min(n_needed, MAX_BUFFER_LEN), read_len) - len(carry)
+        entropy, entropy_offset = carry + entropy_fn(n_read), 0
+        if 8 * len(entropy) + n_pool_bits < n_bits:
+            raise EntropyError('entropy source is exhausted')
+
+    def integer_muncher(n_puids=1):
+        nonlocal entropy_offset, pool, n_pool_bits
+        values = []
+        append = values.append
+        n_draws = 0
+        for n_left in range(n_puids, 0, -1):
+            while True:
+                if n_pool_bits < n_bits:
+                    if len(entropy) <= entropy_offset:
+                        # Expect a few rejected draws over the batch
+                        refill(n_bytes * (n_left + n_left // 8 + 1))
+                    chunk = entropy[entropy_offset:entropy_offset + POOL_LEN]
+                    entropy_offset += len(chunk)
+                    pool |= int.from_bytes(chunk, 'little') << n_pool_bits
+                    n_pool_bits += 8 * len(chunk)
+                    continue
+
+                value = pool & mask
+                pool >>= n_bits
+                n_pool_bits -= n_bits
+                n_draws += 1
+                if value < limit:
+                    break
+
+            append(value % n_values)
+
+        if stats is not None:
+            stats.bits_sliced += n_bits * n_draws
+        return values
+
+    return integer_muncher
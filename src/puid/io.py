@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Iterator, Sequence
+from typing import overload
+
+from puid import parallel
+from puid.puid import Puid
+
+#  Files of fixed-width `puid`s, generated ahead of time for loaders to consume.
+#
+#  A file holds ASCII `puid`s, each followed by the same separator, so the k-th `puid` starts at
+#  byte k * (len + len(sep)). The writer sizes the file up front, memory-maps it and fills it in
+#  place with `Puid.generate_into`, without building the `puid`s in Python. With several workers,
+#  each process maps and fills its own disjoint regions of the file. The reader maps the file and
+#  slices `puid`s out of it on demand.
+
+# Number of puids in each region of the file filled by a worker
+DEFAULT_CHUNK = 1 << 20
+# Number of puids decoded at a time when iterating over a file
+READ_BLOCK_LEN = 1 << 12
+
+
+def write_file(
+    path: str | os.PathLike[str],
+    n: int,
+    rand_id: Puid | None = None,
+    sep: bytes = b'\n',
+    workers: int = 1,
+    chunk: int = DEFAULT_CHUNK,
+) -> int:
+    """
+    Write a file of `n` `puid`s, each followed by `sep`
+
+    A single worker fills the file with `rand_id` itself. Several workers generate `puid`s like
+    `rand_id`, as `parallel.generate` does, drawing entropy from `os.urandom` in each process.
+
+    :param path: Path of the file, which is overwritten
+    :param n: Number of `puid`s to write
+    :param rand_id: `Puid` to generate with, defaults to `Puid()`. Its characters must be ASCII
+    :param sep: Bytes written after each `puid`
+    :param workers: Number of worker processes, or 1 to write in this process
+    :param chunk: Number of `puid`s in each region written by a worker
+    :return int, the size of the file
+    """
+    if n < 0:
+        raise ValueError("n must be a non-negative integer")
+    if chunk <= 0:
+        raise ValueError("chunk must be a positive integer")
+    rand_id = Puid() if rand_id is None else rand_id
+    if not rand_id.codec.table.is_ascii:
+        raise ValueError("puid files require ASCII characters, so every puid has the same width")
+
+    stride = len(rand_id) + len(sep)
+    with open(path, 'wb') as file:
+        file.truncate(n * stride)
+    if n == 0:
+        return 0
+
+    if workers == 1:
+        _write_region(path, rand_id, 0, n, sep)
+        return n * stride
+
+    with parallel.worker_pool(rand_id, workers) as executor:
+        regions = [(start, min(chunk, n - start)) for start in range(0, n, chunk)]
+        futures = [
+            executor.submit(_write_worker_region, path, start, count, sep)
+            for start, count in regions
+        ]
+        for future in futures:
+            future.result()
+    return n * stride
+
+
+def _write_worker_region(path: str | os.PathLike[str], start: int, count: int, sep: bytes) -> None:
+    _write_region(path, parallel.worker_puid(), start, count, sep)
+
+
+def _write_region(
+    path: str | os.PathLike[str],
+    rand_id: Puid,
+    start: int,
+    count: int,
+    sep: bytes,
+) -> None:
+    # Maps puids [start, start + count) of the file. Mappings start on an allocation boundary.
+    stride = len(rand_id) + len(sep)
+    offset = start * stride
+    map_offset = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with open(path, 'r+b') as file, \
+            mmap.mmap(file.fileno(), offset + count * stride - map_offset,
+                      offset=map_offset) as mapped, \
+            memoryview(mapped) as view:
+        rand_id.generate_into(view[offset - map_offset:], count, sep)
+
+
+class PuidFile(Sequence[str]):
+    """
+    `puid`s of a file written by `write_file`, read lazily from a memory map
+
+    The k-th `puid` is sliced straight out of the map, so random access takes constant time.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        sep: bytes = b'\n',
+        puid_len: int | None = None,
+    ) -> None:
+        """
+        :param path: Path of the file
+        :param sep: Bytes written after each `puid`
+        :param puid_len: Number of characters in a `puid`, found from the first separator if None
+        """
+        if puid_len is None and not sep:
+            raise ValueError("puid_len is required without a separator")
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            # The map keeps the file open until it is closed. Empty files cannot be mapped.
+            self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        if puid_len is None:
+            puid_len = self._mapped.find(sep) if self._mapped is not None else 0
+        self.puid_len = puid_len
+        self._stride = puid_len + len(sep)
+        if puid_len < 0 or not self._stride or size % self._stride:
+            self.close()
+            raise ValueError("file does not hold puids of a single length, each followed by sep")
+        self._len = size // self._stride
+
+    def __len__(self) -> int:
+        return self._len
+
+    @overload
+    def __getitem__(self, ndx: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, ndx: slice) -> list[str]:
+        ...
+
+    def __getitem__(self, ndx: int | slice) -> str | list[str]:
+        if isinstance(ndx, slice):
+            return [self[k] for k in range(*ndx.indices(self._len))]
+        if ndx < 0:
+            ndx += self._len
+        if not 0 <= ndx < self._len:
+            raise IndexError("puid index out of range")
+        assert self._mapped is not None
+        offset = ndx * self._stride
+        return self._mapped[offset:offset + self.puid_len].decode('ascii')
+
+    def __iter__(self) -> Iterator[str]:
+        # A block of puids is decoded at a time, rather than each puid
+        puid_len = self.puid_len
+        stride = self._stride
+        block_len = READ_BLOCK_LEN * stride
+        for block_offset in range(0, self._len * stride, block_len):
+            assert self._mapped is not None
+            block = self._mapped[block_offset:block_offset + block_len].decode('ascii')
+            yield from (block[offset:offset + puid_len] for offset in range(0, len(block), stride))
+
+    def close(self) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+
+    def __enter__(self) -> PuidFile:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any
+
+from puid.chars import Charsets
+from puid.puid import Puid
+
+#  Generation is CPU bound, so bulk generation fans chunks of puids out over worker processes.
+#
+#  Each worker builds its own Puid with the charset, length and settings of the given Puid. The
+#  entropy source is not sent to the workers: every worker draws from `os.urandom`, the OS CSPRNG,
+#  which is independent in each process.
+
+DEFAULT_CHUNK = 100_000
+
+# Puid of the worker process, built once by the pool initializer
+_worker_puid: Puid | None = None
+
+
+def _puid_kwargs(rand_id: Puid) -> dict[str, Any]:
+    charset = rand_id.charset
+    return {
+        # Aim half a character below the length, so rounding never adds a character
+        'bitwidth': (len(rand_id) - 0.5) * rand_id.bits_per_char,
+        'charset': charset.characters if charset.kind == Charsets.CUSTOM else charset.kind,
+        'backend': rand_id.backend,
+        'strategy': rand_id.strategy,
+        'buffer_size': rand_id.buffer_size,
+    }
+
+
+def _init_worker(puid_kwargs: dict[str, Any]) -> None:
+    global _worker_puid
+    _worker_puid = Puid(**puid_kwargs)
+
+
+def worker_pool(rand_id: Puid, workers: int) -> ProcessPoolExecutor:
+    """
+    Pool of worker processes, each with its own `Puid` like `rand_id`, returned by `worker_puid`
+
+    :param rand_id: `Puid` to generate like
+    :param workers: Number of worker processes
+    :return ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(_puid_kwargs(rand_id), ),
+    )
+
+
+def worker_puid() -> Puid:
+    """
+    `Puid` of this worker process, in a pool made by `worker_pool`
+
+    :return Puid
+    """
+    if _worker_puid is None:
+        raise RuntimeError("worker_puid is only available in a process of worker_pool")
+    return _worker_puid
+
+
+def _generate_chunk(n: int) -> str:
+    # The puids are sent back as a single str, which pickles far cheaper than a list of n puids
+    return worker_puid()._munchers.chars(n)
+
+
+def generate(
+    n: int,
+    rand_id: Puid | None = None,
+    workers: int | None = None,
+    chunk: int = DEFAULT_CHUNK,
+    ordered: bool = True,
+) -> Iterator[str]:
+    """
+    Lazily yield `n` `puid`s generated in parallel by a pool of worker processes
+
+    Workers generate `puid`s like `rand_id`, but draw entropy from `os.urandom` in each
+    process rather than from the entropy source of `rand_id`
+
+    :param n: Number of `puid`s to yield
+    :param rand_id: `Puid` to generate like, defaults to `Puid()`
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param chunk: Number of `puid`s generated per task sent to a worker
+    :param ordered: Yield chunks in submission order, rather than as soon as each completes
+    """
+    if chunk <= 0:
+        raise ValueError("chunk must be a positive integer")
+    rand_id = Puid() if rand_id is None else rand_id
+    workers = workers or os.cpu_count() or 1
+    puid_len = len(rand_id)
+    counts = [chunk] * (n // chunk) + ([n % chunk] if 0 < n % chunk else [])
+    if not counts:
+        return
+
+    executor = worker_pool(rand_id, workers)
+    # Bound the chunks in flight, so memory stays flat however slowly puids are consumed
+    max_pending = 2 * workers
+    pending: deque[Future[str]] = deque()
+    try:
+        for count in counts:
+            if max_pending <= len(pending):
+                yield from _split(_next_done(pending, ordered), puid_len)
+            pending.append(executor.submit(_generate_chunk, count))
+        while pending:
+            yield from _split(_next_done(pending, ordered), puid_len)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _next_done(pending: deque[Future[str]], ordered: bool) -> str:
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = done.pop()
+    pending.remove(future)
+    return future.result()
+
+
+def _split(chars: str, puid_len: int) -> list[str]:
+    return [chars[ndx:ndx + puid_len] for ndx in range(0, len(chars), puid_len)]
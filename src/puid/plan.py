@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import functools
+from math import ceil, log2
+from typing import assert_never
+
+from puid.bits import value_shifts
+from puid.chars import Charset, Charsets
+from puid.codec import Codec, codec
+from puid.encoder import CharsTable, chars_table
+
+# Upper bound on cached plans, so memory stays bounded however many configurations are seen
+PLAN_CACHE_SIZE = 4096
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Plan:
+    """
+    Everything a `Puid` precomputes for a charset and bitwidth, shared by all `Puid`s alike
+    """
+    characters: str
+    puid_len: int
+    bits_per_char: float
+    bitwidth: float
+    # Entropy representation efficiency
+    ere: float
+    # Bits consumed by slicing each possible value
+    shifts: tuple[int, ...]
+    charset: Charset = dc.field(compare=False)
+    table: CharsTable = dc.field(compare=False)
+    codec: Codec = dc.field(compare=False)
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def plan(charset: Charsets | str, bitwidth: float) -> Plan:
+    """
+    Plan of `puid`s of at least bitwidth bits, made of the characters of charset. Plans are cached
+
+    :param charset: Predefined `Charsets` member or custom characters
+    :param bitwidth: Minimum bits of entropy of each `puid`
+    :return Plan
+    """
+    # yapf: disable
+    match charset:
+        case Charsets():
+            chars = Charset.predefined(kind=charset)
+        case str(characters):
+            chars = Charset.custom(characters=characters)
+        case unreachable:
+            assert_never(unreachable)
+    # yapf: enable
+
+    n_chars = len(chars.characters)
+    bits_per_char = log2(n_chars)
+    puid_len = int(ceil(bitwidth / bits_per_char))
+    return Plan(
+        characters=chars.characters,
+        puid_len=puid_len,
+        bits_per_char=bits_per_char,
+        bitwidth=puid_len * bits_per_char,
+        ere=(bits_per_char * n_chars) / (8 * len(chars.characters.encode('utf-8'))),
+        shifts=value_shifts(n_chars),
+        charset=chars,
+        table=chars_table(chars.characters),
+        codec=codec(chars.characters, puid_len),
+    )
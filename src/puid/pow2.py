@@ -0,0 +1,127 @@
+from functools import lru_cache
+from math import ceil
+
+from puid.bits import DEFAULT_BUFFER_LEN, MAX_BUFFER_LEN
+from puid.puid_error import EntropyError
+
+#  When the number of characters is a power of 2, every n-bit slice of entropy is a valid value,
+#  so whole blocks of entropy bytes convert to characters without a per-character Python loop.
+#
+#  Every n bytes hold exactly 8 n-bit values. Each n-byte chunk is first spread into the low
+#  bytes of a 64-bit slot, and the block is loaded as a single int. Three rounds of shifts and
+#  masks then halve the fields until each n-bit value sits in its own byte:
+#
+#    n = 5:  [ 40 ] -> [ 20 | 20 ] -> [ 10 | 10 | 10 | 10 ] -> [ 5 | 5 | 5 | 5 | 5 | 5 | 5 | 5 ]
+#
+#  Values keep the order of the entropy bits, so slicing matches `bits.muncher` exactly.
+
+
+# Mask sets kept for reuse. A set for a block of MAX_BUFFER_LEN bytes takes up to 3 such blocks.
+MASKS_CACHE_LEN = 16
+
+
+@lru_cache(maxsize=MASKS_CACHE_LEN)
+def unpack_masks(n_bits, n_chunks):
+    masks = []
+    for n_field_bits, stride in ((4 * n_bits, 32), (2 * n_bits, 16), (n_bits, 8)):
+        n_pair_bytes = stride // 4
+        low = ((1 << n_field_bits) - 1).to_bytes(n_pair_bytes, 'big')
+        high = (((1 << n_field_bits) - 1) << stride).to_bytes(n_pair_bytes, 'big')
+        n_pairs = 8 * n_chunks // n_pair_bytes
+        masks.append((
+            stride - n_field_bits,
+            int.from_bytes(low * n_pairs, 'big'),
+            int.from_bytes(high * n_pairs, 'big'),
+        ))
+    return tuple(masks)
+
+
+def unpack_bits(data, n_bits):
+    # len(data) must be a multiple of n_bits; returns one n-bit value per byte
+    if n_bits == 8:
+        return bytes(data)
+
+    n_chunks = len(data) // n_bits
+    slots = bytearray(8 * n_chunks)
+    for ndx in range(n_bits):
+        slots[8 - n_bits + ndx::8] = data[ndx::n_bits]
+
+    value = int.from_bytes(slots, 'big')
+    # Masks of blocks larger than any entropy read are not worth keeping
+    masks = unpack_masks(n_bits, n_chunks) if n_chunks * n_bits <= MAX_BUFFER_LEN else \
+        unpack_masks.__wrapped__(n_bits, n_chunks)
+    for shift, low, high in masks:
+        value = (value & low) | ((value << shift) & high)
+    return value.to_bytes(8 * n_chunks, 'big')
+
+
+def pow2_muncher(n_chars,
+                 puid_len,
+                 entropy_fn,
+                 table,
+                 buffer_len=DEFAULT_BUFFER_LEN,
+                 stats=None):
+    n_bits_per_char = n_chars.bit_length() - 1
+    # Bytes in a chunk of 8 characters
+    chunk_len = n_bits_per_char
+
+    # Read and convert at least buffer_len bytes at a time, so single puids share the entropy
+    # read and the conversion overhead
+    n_bytes_per_puid = ceil(n_bits_per_char * puid_len / 8)
+    block_len = chunk_len * ceil(max(n_bytes_per_puid, buffer_len) / chunk_len)
+
+    pending = ''
+    pending_offset = 0
+    carry = b''
+
+    def encoded(data):
+        return table.encode(unpack_bits(data, n_bits_per_char))
+
+    def refill(n_needed):
+        # Characters of the next block of entropy, for n_needed characters or more
+        nonlocal carry
+        n_bytes = ceil(n_bits_per_char * n_needed / 8)
+        n_read = min(chunk_len * ceil(n_bytes / chunk_len), MAX_BUFFER_LEN)
+        n_read = max(n_read - len(carry), block_len)
+
+        if stats is not None:
+            stats.bits_carried += 8 * len(carry)
+        fresh = entropy_fn(n_read)
+        data = carry + fresh
+        n_whole = len(data) - len(data) % chunk_len
+        carry = data[n_whole:]
+
+        chars = encoded(data[:n_whole])
+        if not fresh:
+            if not carry:
+                raise EntropyError('entropy source is exhausted')
+            # Encode the partial chunk left by an exhausted source, keeping only whole characters
+            n_tail = 8 * len(carry) // n_bits_per_char
+            chars += encoded(carry.ljust(chunk_len, b'\0'))[:n_tail]
+            carry = b''
+        return chars
+
+    def chars_muncher(n_puids=1):
+        nonlocal pending, pending_offset
+        n_chars = puid_len * n_puids
+        if stats is not None:
+            # No value is ever rejected
+            stats.bits_sliced += n_bits_per_char * n_chars
+
+        end = pending_offset + n_chars
+        if end <= len(pending):
+            pending_offset = end
+            return pending[end - n_chars:end]
+
+        # Blocks are joined once per call, and only the last one is kept as pending
+        blocks = [pending[pending_offset:]]
+        n_blocked = len(blocks[0])
+        while n_blocked < n_chars:
+            blocks.append(refill(n_chars - n_blocked))
+            n_blocked += len(blocks[-1])
+        pending = blocks[-1]
+        pending_offset = len(pending) - (n_blocked - n_chars)
+        blocks[-1] = pending[:pending_offset]
+        return ''.join(blocks)
+
+    return chars_muncher
@@ -1,29 +1,77 @@
 from __future__ import annotations
 
 import dataclasses as dc
-import secrets
+import os
+import threading
+import weakref
 from math import ceil, log2
-from collections.abc import Callable
-from typing import Any, assert_never
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Literal
 
-import puid.chars
-from puid.chars import Charsets, Charset, is_valid_charset
-from puid.bits import muncher
+from puid.chars import Charsets, Charset
+from puid.bits import DEFAULT_BUFFER_LEN, muncher
 from puid.chars_error import InvalidChars
-from puid.encoder import get_encoder
-from puid.entropy import bits_for_total_risk
+from puid.codec import Codec
+from puid.integer import integer_draw, integer_muncher
+from puid.plan import Plan, plan
+from puid.pow2 import pow2_muncher
 from puid.puid_error import BitsError, TotalRiskError
+from puid.stats import Stats, ThreadStats, counted_entropy
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
-@dc.dataclass(slots=True, init=False)
+Backend = Literal["python", "numpy"]
+# How entropy becomes characters: "bits" slices and rejects a value per character, "integer"
+# draws and rejects a whole integer per `puid`, taking fewer entropy bits
+Strategy = Literal["bits", "integer"]
+
+# Number of puids written at a time by `generate_into`, bounding its scratch memory
+INTO_BATCH_LEN = 1 << 14
+
+# Default bounds on the puids generated ahead of demand for `agenerate` and `astream`
+PREFETCH_LOW_WATERMARK = 256
+PREFETCH_HIGH_WATERMARK = 4096
+
+
+#  Generator state, such as entropy read ahead and not yet used, is process memory that a forked
+#  child inherits. Every child would then generate the same `puid`s as its siblings until that
+#  state runs out, so the children of a fork discard the state of every `Puid` and rebuild it
+#  lazily, as a new thread does.
+
+
+class _Munchers(threading.local):
+    # Each thread lazily gets its own munchers, so threads sharing a Puid never slice the same
+    # entropy bits, and generating needs no lock
+    def __init__(self, new_munchers: Callable[[], tuple[Any, Any, Any]]) -> None:
+        self._new_munchers = new_munchers
+        # Prefetcher for asyncio, and the prefetch settings it was built with
+        self.prefetcher: Any = None
+        self.prefetch: tuple[int, int, Executor | None] | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Munchers are built on their thread's first use, so idle Puids hold none
+        if name not in ('chars', 'codes', 'ints'):
+            raise AttributeError(name)
+        self.chars, self.codes, self.ints = self._new_munchers()
+        return getattr(self, name)
+
+
+@dc.dataclass(slots=True, weakref_slot=True, init=False)
 class Puid:
     bitwidth: float = 128
     charset: Charset = dc.field(init=False)
     bits_per_char: float = dc.field(init=False)
+    backend: Backend = dc.field(init=False)
+    strategy: Strategy = dc.field(init=False)
+    buffer_size: int = dc.field(init=False)
     _len_in_chars: int = dc.field(init=False)
+    _plan: Plan = dc.field(init=False, repr=False)
 
-    _bits_muncher: Any = dc.field(init=False)
-    _encoded: Any = dc.field(init=False)
+    _munchers: _Munchers = dc.field(init=False, repr=False)
+    _new_munchers: Callable[[], tuple[Any, Any, Any]] = dc.field(init=False, repr=False)
+    _prefetch: tuple[int, int, Executor | None] = dc.field(init=False, repr=False)
+    _stats: ThreadStats | None = dc.field(init=False, repr=False)
     _ere: Any = dc.field(init=False)
 
     @classmethod
@@ -32,52 +80,386 @@ class Puid:
         total: int,
         risk: float,
         charset: Charsets | str = Charsets.SAFE64,
-        entropy_source: Callable[[int | None], bytes] = secrets.token_bytes,
+        entropy_source: Callable[[int], bytes] = os.urandom,
+        backend: Backend = "python",
+        buffer_size: int = DEFAULT_BUFFER_LEN,
+        track_stats: bool = False,
+        strategy: Strategy = "bits",
     ) -> Puid:
+        # Imported lazily, as only needed for a total and risk
+        from puid.entropy import bits_for_total_risk
+
         return cls(
             bitwidth=bits_for_total_risk(total, risk),
             charset=charset,
             entropy_source=entropy_source,
+            backend=backend,
+            buffer_size=buffer_size,
+            track_stats=track_stats,
+            strategy=strategy,
         )
 
     def __init__(
         self,
         bitwidth: float = 128,
         charset: Charsets | str = Charsets.SAFE64,
-        entropy_source: Callable[[int | None], bytes] = secrets.token_bytes,
+        entropy_source: Callable[[int], bytes] = os.urandom,
+        backend: Backend = "python",
+        buffer_size: int = DEFAULT_BUFFER_LEN,
+        track_stats: bool = False,
+        strategy: Strategy = "bits",
     ) -> None:
         if bitwidth <= 0:
             raise BitsError("bits must be a positive integer")
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be a positive integer")
 
-        # yapf: disable
-        match charset:
-            case puid.chars.Charsets() as charset:
-                self.charset = Charset.predefined(kind=charset)
-            case str(chars):
-                self.charset = Charset.custom(characters=chars)
-            case unreachable:
-                assert_never(unreachable)
-        # yapf: enable
+        # Tables and sizes are computed once per charset and bitwidth, and shared
+        self._plan = plan(charset, bitwidth)
+        self.charset = self._plan.charset
+        self.bits_per_char = self._plan.bits_per_char
+        self._len_in_chars = self._plan.puid_len
+        self.bitwidth = self._plan.bitwidth
 
         n_chars = len(self.charset.characters)
-        self.bits_per_char = log2(n_chars)
-        self._len_in_chars = int(ceil(bitwidth / self.bits_per_char))
-        self.bitwidth = self._len_in_chars * self.bits_per_char
+        puid_len = self._len_in_chars
+        table = self._plan.table
+        codec = self._plan.codec
+        self.backend = backend
+        # Bytes read ahead from the entropy source, shared by consecutive puids
+        self.buffer_size = buffer_size
+        self.strategy = strategy
+        match backend, strategy:
+            case "numpy", "bits":
+                # Imported lazily, as NumPy is an optional dependency
+                from puid.vectorized import numpy_muncher
+
+                def new_engines(entropy_fn, stats):
+                    codes_muncher = numpy_muncher(n_chars, puid_len, entropy_fn, buffer_size,
+                                                  stats)
+                    return (
+                        lambda n_puids=1: table.encode(codes_muncher(n_puids).tobytes()),
+                        codes_muncher,
+                        integer_muncher(n_chars, puid_len, entropy_fn, buffer_size, stats),
+                    )
+            case "python", "integer":
+                def new_engines(entropy_fn, stats):
+                    ints_muncher = integer_muncher(n_chars, puid_len, entropy_fn, buffer_size,
+                                                   stats)
+                    return (
+                        lambda n_puids=1: table.encode(codec.codes(ints_muncher(n_puids))),
+                        None,
+                        ints_muncher,
+                    )
+            case "python", "bits" if n_chars.bit_count() == 1:
+                # Power of 2 charsets never reject a value, so entropy converts to chars in bulk
+                def new_engines(entropy_fn, stats):
+                    return (
+                        pow2_muncher(n_chars, puid_len, entropy_fn, table, buffer_size, stats),
+                        None,
+                        integer_muncher(n_chars, puid_len, entropy_fn, buffer_size, stats),
+                    )
+            case "python", "bits":
+                def new_engines(entropy_fn, stats):
+                    bits_muncher = muncher(n_chars, puid_len, entropy_fn, buffer_size, stats)
+                    return (
+                        lambda n_puids=1: table.encode(bits_muncher(n_puids)),
+                        None,
+                        integer_muncher(n_chars, puid_len, entropy_fn, buffer_size, stats),
+                    )
+            case other:
+                raise ValueError(f"unsupported backend and strategy: {other!r}")
+
+        # Stats of each thread alive, and of the threads gone, summed by `stats`
+        self._stats = ThreadStats() if track_stats else None
+        thread_stats = self._stats
+        # Integers are drawn whole, whatever the strategy
+        n_bits_per_int = integer_draw(n_chars, puid_len)[0]
+        if strategy == "integer":
+            n_bits_per_puid = n_bits_per_int
+        else:
+            n_bits_per_puid = puid_len * ceil(log2(n_chars))
+
+        def new_munchers():
+            if thread_stats is None:
+                return new_engines(entropy_source, None)
 
-        self._bits_muncher = muncher(n_chars, self._len_in_chars,
-                                     entropy_source)
-        chars_encoder = get_encoder(self.charset)
+            stats = Stats()
 
-        def encoded(values):
-            return [chr(chars_encoder(value)) for value in values]
+            def counted(munch, n_bits):
+                if munch is None:
+                    return None
 
-        self._encoded = encoded
-        self._ere = (self.bits_per_char * n_chars) / (
-            8 * len(self.charset.characters.encode('utf-8')))
+                def counted_munch(n_puids=1):
+                    result = munch(n_puids)
+                    stats.puids += n_puids
+                    stats.bits_used += n_bits * n_puids
+                    return result
+
+                return counted_munch
+
+            chars_muncher, codes_muncher, ints_muncher = new_engines(
+                counted_entropy(entropy_source, stats), stats)
+            counted_chars = counted(chars_muncher, n_bits_per_puid)
+            # The thread's stats are folded into the total once its munchers are dropped
+            thread_stats.add(stats, counted_chars)
+            return (
+                counted_chars,
+                counted(codes_muncher, n_bits_per_puid),
+                counted(ints_muncher, n_bits_per_int),
+            )
+
+        self._new_munchers = new_munchers
+        self._munchers = _Munchers(new_munchers)
+        self._prefetch = (PREFETCH_LOW_WATERMARK, PREFETCH_HIGH_WATERMARK, None)
+        self._ere = self._plan.ere
+        _puids[id(self)] = self
 
     def __len__(self) -> int:
         return self._len_in_chars
 
     def generate(self):
-        values = self._bits_muncher()
-        return "".join(self._encoded(values))
+        return self._munchers.chars()
+
+    def generate_many(self, n: int) -> list[str]:
+        """
+        Generate `n` `puid`s at once, amortizing entropy reads and encoding over the batch
+
+        :param n: Number of `puid`s to generate
+        :return list[str]
+        """
+        if n <= 0:
+            return []
+        puid_len = self._len_in_chars
+        chars = self._munchers.chars(n)
+        return [chars[ndx:ndx + puid_len] for ndx in range(0, n * puid_len, puid_len)]
+
+    def generate_into(self, buffer: Any, count: int, sep: bytes = b"\n") -> int:
+        """
+        Generate `count` `puid`s straight into a writable buffer, as UTF-8, each followed by `sep`
+
+        ASCII `puid`s all have `len(puid) + len(sep)` bytes, and are written a batch at a time, one
+        column of characters per slice assignment, so nothing is created per `puid`. Other
+        characters have variable widths, and are encoded `puid` by `puid`.
+
+        :param buffer: Writable buffer, such as a `bytearray`, `memoryview` or `mmap`
+        :param count: Number of `puid`s to generate
+        :param sep: Bytes written after each `puid`
+        :return int, the number of bytes written
+        """
+        if count <= 0:
+            return 0
+
+        with memoryview(buffer) as view, view.cast('B') as out:
+            if not self._plan.table.is_ascii:
+                encoded = sep.join([id.encode('utf-8') for id in self.generate_many(count)]) + sep
+                if len(out) < len(encoded):
+                    raise ValueError(f"buffer of {len(out)} bytes is too small for {count} puids")
+                out[:len(encoded)] = encoded
+                return len(encoded)
+
+            puid_len = self._len_in_chars
+            stride = puid_len + len(sep)
+            n_bytes = count * stride
+            if len(out) < n_bytes:
+                raise ValueError(f"buffer of {len(out)} bytes is too small for {count} puids")
+
+            # Separators are written once, and stay put while the characters of each batch are
+            # written around them
+            batch = bytearray(min(count, INTO_BATCH_LEN) * stride)
+            for ndx in range(len(sep)):
+                batch[puid_len + ndx::stride] = sep[ndx:ndx + 1] * (len(batch) // stride)
+            batch_view = memoryview(batch)
+
+            offset = 0
+            while offset < n_bytes:
+                n_batch_bytes = min(n_bytes - offset, len(batch))
+                chars = self._munchers.chars(n_batch_bytes // stride).encode('ascii')
+                for ndx in range(puid_len):
+                    batch[ndx:n_batch_bytes:stride] = chars[ndx::puid_len]
+                out[offset:offset + n_batch_bytes] = batch_view[:n_batch_bytes]
+                offset += n_batch_bytes
+            return n_bytes
+
+    def generate_int(self) -> int:
+        """
+        Generate the integer a `puid` stands for, without writing it in characters
+
+        :return int in [0, `codec.n_values`)
+        """
+        return self._munchers.ints()[0]
+
+    def generate_bytes(self) -> bytes:
+        """
+        Generate the bytes form of a `puid`: its integer, big-endian, in `codec.n_bytes` bytes
+
+        :return bytes
+        """
+        return self._munchers.ints()[0].to_bytes(self._plan.codec.n_bytes, 'big')
+
+    def generate_many_ints(self, n: int) -> list[int]:
+        """
+        Generate the integers of `n` `puid`s at once
+
+        :param n: Number of integers to generate
+        :return list[int]
+        """
+        if n <= 0:
+            return []
+        return self._munchers.ints(n)
+
+    def generate_many_bytes(self, n: int) -> list[bytes]:
+        """
+        Generate the bytes forms of `n` `puid`s at once
+
+        :param n: Number of bytes forms to generate
+        :return list[bytes]
+        """
+        n_bytes = self._plan.codec.n_bytes
+        return [value.to_bytes(n_bytes, 'big') for value in self.generate_many_ints(n)]
+
+    def is_valid(self, puid: str) -> bool:
+        """
+        Whether `puid` is made of this instance's characters, and of its length
+
+        :param puid: `puid` to check
+        :return bool
+        """
+        return self._plan.codec.is_valid(puid)
+
+    def is_valid_many(self, puids: Sequence[str] | bytes | bytearray | memoryview) -> list[bool]:
+        """
+        Whether each of many `puid`s is valid, as `is_valid`, checked without a temporary per `puid`
+        for ASCII charsets
+
+        :param puids: `puid`s, or a buffer of newline delimited UTF-8 `puid`s
+        :return list[bool], a flag per `puid`
+        """
+        return self._plan.codec.valid_mask(puids)
+
+    def decode(self, puid: str) -> int:
+        """
+        Integer `puid` stands for, as returned by `generate_int`
+
+        :param puid: `puid` to decode
+        :return int
+        """
+        return self._plan.codec.decode_int(puid)
+
+    @property
+    def codec(self) -> Codec:
+        """
+        Conversion of this instance's `puid`s to and from their integers and bytes forms
+        """
+        return self._plan.codec
+
+    def generate_iter(self, n: int | None = None, batch_size: int = 1024) -> Iterator[str]:
+        """
+        Lazily yield `n` `puid`s (or endlessly, if `n` is None), generated `batch_size` at a time
+
+        `puid`s left in a batch when the iterator is discarded are never returned by this instance
+
+        :param n: Number of `puid`s to yield, or None for no limit
+        :param batch_size: Number of `puid`s generated per batch
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        def batches(n: int | None) -> Iterator[str]:
+            while n is None or 0 < n:
+                count = batch_size if n is None else min(n, batch_size)
+                yield from self.generate_many(count)
+                if n is not None:
+                    n -= count
+
+        return batches(n)
+
+    def generate_array(self, n: int, kind: str = "U") -> Any:
+        """
+        Generate `n` `puid`s as a NumPy array. Requires `backend="numpy"`
+
+        :param n: Number of `puid`s to generate
+        :param kind: "codes" for a (n, len) uint8 matrix of character indexes, "S" for fixed-width
+            bytes (ASCII characters only) or "U" for fixed-width str
+        :return numpy.ndarray
+        """
+        if self.backend != "numpy":
+            raise ValueError("generate_array requires backend='numpy'")
+
+        from puid.vectorized import codes_array
+        return codes_array(self._munchers.codes(n), self.charset.characters, kind)
+
+    def stats(self) -> Stats:
+        """
+        Entropy accounting of all `puid`s generated so far, in every thread. Requires
+        `track_stats=True`
+
+        :return Stats
+        """
+        if self._stats is None:
+            raise ValueError("stats requires track_stats=True")
+        return self._stats.total()
+
+    async def agenerate(self) -> str:
+        """
+        Await a `puid` without blocking the event loop on the entropy source
+
+        `puid`s are generated ahead of demand in an executor, as configured by `prefetch`
+
+        :return str
+        """
+        return await self._prefetcher().get()
+
+    def astream(self, n: int | None = None) -> AsyncIterator[str]:
+        """
+        Asynchronously yield `n` `puid`s (or endlessly, if `n` is None), as `agenerate` does
+
+        :param n: Number of `puid`s to yield, or None for no limit
+        """
+        return self._prefetcher().stream(n)
+
+    def prefetch(
+        self,
+        low_watermark: int = PREFETCH_LOW_WATERMARK,
+        high_watermark: int = PREFETCH_HIGH_WATERMARK,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Configure the `puid`s generated ahead of demand for `agenerate` and `astream`
+
+        Once no more than `low_watermark` `puid`s are left, `high_watermark` `puid`s are topped up
+        in the background. Reconfiguring discards the `puid`s already prefetched.
+
+        :param low_watermark: Number of `puid`s left that triggers a refill
+        :param high_watermark: Number of `puid`s after a refill
+        :param executor: Executor generating the `puid`s, defaults to the loop's default executor
+        """
+        from puid.aio import Prefetcher
+        prefetch = (low_watermark, high_watermark, executor)
+        self._munchers.prefetcher = Prefetcher(self.generate_many, *prefetch)
+        self._munchers.prefetch = self._prefetch = prefetch
+
+    def _prefetcher(self) -> Any:
+        # Each thread, so each event loop, prefetches for itself
+        munchers = self._munchers
+        if munchers.prefetch is not self._prefetch:
+            from puid.aio import Prefetcher
+            munchers.prefetcher = Prefetcher(self.generate_many, *self._prefetch)
+            munchers.prefetch = self._prefetch
+        return munchers.prefetcher
+
+
+# Puids of this process, whose generator state is discarded in forked children. Puids compare by
+# value, so are not hashable, and are kept by id.
+_puids: weakref.WeakValueDictionary[int, Puid] = weakref.WeakValueDictionary()
+
+
+def _reset_after_fork() -> None:
+    for rand_id in _puids.values():
+        if rand_id._stats is not None:
+            rand_id._stats.after_fork()
+        rand_id._munchers = _Munchers(rand_id._new_munchers)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -20,3 +20,27 @@ class TotalRiskError(PuidError):
       - total and risk are not both specified
     """
     pass
+
+
+class EntropyError(PuidError):
+    """
+    Raised when
+      - the entropy source is exhausted before a `puid` is complete
+    """
+    pass
+
+
+class InvalidPuid(PuidError):
+    """
+    Raised when
+      - a `puid` has characters outside its charset, or not the length of its bitwidth
+    """
+    pass
+
+
+class UniquenessError(PuidError):
+    """
+    Raised when
+      - no `puid` unseen by a `UniquePuid` is left to generate
+    """
+    pass
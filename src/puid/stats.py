@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import threading
+import weakref
+
+
+@dc.dataclass(slots=True)
+class Stats:
+    """
+    Entropy accounting of a `Puid` created with `track_stats=True`
+
+    Bits are sliced into values which are either accepted, and mapped to characters, or rejected.
+    The NumPy backend counts bits as it slices each block of entropy, ahead of the `puid`s the values
+    end up in.
+    """
+    # puids generated
+    puids: int = 0
+    # Calls to the entropy source, each refilling the reservoir
+    entropy_calls: int = 0
+    # Bits returned by the entropy source
+    bits_read: int = 0
+    # Bits sliced into accepted or rejected values
+    bits_sliced: int = 0
+    # Bits of accepted values
+    bits_used: int = 0
+    # Unused bits kept in the reservoir when it is refilled
+    bits_carried: int = 0
+
+    @property
+    def bits_rejected(self) -> int:
+        return self.bits_sliced - self.bits_used
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.bits_rejected / self.bits_sliced if self.bits_sliced else 0.0
+
+    @property
+    def bits_per_puid(self) -> float:
+        return self.bits_sliced / self.puids if self.puids else 0.0
+
+    def __add__(self, other: Stats) -> Stats:
+        return Stats(*(getattr(self, field.name) + getattr(other, field.name)
+                       for field in dc.fields(self)))
+
+
+class ThreadStats:
+    """
+    Stats of each thread generating with a `Puid`, folded into a total once the thread's munchers
+    are dropped, as when the thread ends. Memory stays bounded by the threads alive.
+    """
+    __slots__ = ('_lock', '_total', '_live')
+
+    def __init__(self) -> None:
+        # Reentrant, as a thread may be collected, and folded, while this thread holds the lock
+        self._lock = threading.RLock()
+        self._total = Stats()
+        self._live: dict[int, Stats] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def add(self, stats: Stats, owner: object) -> None:
+        """
+        Keep the stats of a thread apart until owner is collected
+
+        :param stats: Stats of the thread
+        :param owner: Object living as long as the thread's munchers
+        """
+        with self._lock:
+            self._live[id(stats)] = stats
+        weakref.finalize(owner, self._fold, id(stats))
+
+    def _fold(self, key: int) -> None:
+        with self._lock:
+            self._total = self._total + self._live.pop(key)
+
+    def total(self) -> Stats:
+        with self._lock:
+            return sum(self._live.values(), self._total)
+
+    def after_fork(self) -> None:
+        # The lock may have been held by a thread of the parent, which the child lacks
+        self._lock = threading.RLock()
+
+
+def counted_entropy(entropy_fn, stats: Stats):
+    # Entropy source wrapper counting calls and bits read
+    def entropy_source(n_bytes):
+        entropy = entropy_fn(n_bytes)
+        stats.entropy_calls += 1
+        stats.bits_read += 8 * len(entropy)
+        return entropy
+
+    return entropy_source
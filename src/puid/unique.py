@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from array import array
+from math import ceil, log
+from typing import Literal
+
+from puid.puid import Puid
+from puid.puid_error import UniquenessError
+
+#  `puid`s that never repeat within a run.
+#
+#  `puid`s are generated as the integers they stand for, which are uniform, and a `puid` already
+#  seen is regenerated. Each `puid` is then uniform over the `puid`s not yet seen, as if drawn
+#  without replacement, and the distribution is otherwise unchanged.
+#
+#  Seen integers are kept in either:
+#    - an exact set: an open addressing table of 8-byte slots, as the integers are uniform and need
+#      no hashing. Integers of 64 bits or more are kept in a Python set.
+#    - a Bloom filter of fixed size. A false positive only skips a `puid` that was never generated,
+#      which is equally likely to be any of them, so `puid`s still never repeat.
+
+Dedupe = Literal["exact", "bloom"]
+
+DEFAULT_CAPACITY = 1 << 16
+DEFAULT_FALSE_POSITIVE_RATE = 1e-6
+# Consecutive seen puids after which a Bloom filter is deemed full
+MAX_REGENERATED = 1000
+
+M64 = (1 << 64) - 1
+
+
+class IntSet:
+    """
+    Exact set of uniform integers below 2**64 - 1, in a table of 8-byte slots kept at most 2/3
+    full. A slot holds its integer plus 1, so 0 marks an empty slot.
+    """
+    __slots__ = ('_slots', '_mask', '_len')
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        n_slots = 1 << max(3 * capacity // 2, 8).bit_length()
+        self._slots = array('Q', bytes(8 * n_slots))
+        self._mask = n_slots - 1
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, value: int) -> bool:
+        slots = self._slots
+        mask = self._mask
+        key = value + 1
+        # Uniform integers are spread by their low bits alone
+        ndx = value & mask
+        while slots[ndx]:
+            if slots[ndx] == key:
+                return True
+            ndx = (ndx + 1) & mask
+        return False
+
+    def add(self, value: int) -> bool:
+        """
+        Add an integer, unless already in the set
+
+        :param value: Integer to add
+        :return bool, whether value was added
+        """
+        slots = self._slots
+        mask = self._mask
+        key = value + 1
+        ndx = value & mask
+        while slot := slots[ndx]:
+            if slot == key:
+                return False
+            ndx = (ndx + 1) & mask
+        slots[ndx] = key
+
+        self._len += 1
+        if 2 * len(slots) < 3 * self._len:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        keys = [key for key in self._slots if key]
+        n_slots = 2 * len(self._slots)
+        self._slots = array('Q', bytes(8 * n_slots))
+        self._mask = n_slots - 1
+        self._len = 0
+        for key in keys:
+            self.add(key - 1)
+
+
+class BloomFilter:
+    """
+    Set of integers which may report integers never added, at a rate bounded by its size
+    """
+    __slots__ = ('_bits', '_n_bits', '_n_hashes', '_len')
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        max_bytes: int | None = None,
+    ) -> None:
+        """
+        :param capacity: Number of integers expected to be added
+        :param false_positive_rate: Rate of false positives once capacity integers are added
+        :param max_bytes: Bound on the size of the filter, which raises the false positive rate
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be in (0, 1)")
+        n_bits = ceil(-max(capacity, 1) * log(false_positive_rate) / log(2)**2)
+        if max_bytes is not None:
+            n_bits = min(n_bits, 8 * max_bytes)
+        if n_bits <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+        self._bits = bytearray((n_bits + 7) // 8)
+        self._n_bits = n_bits
+        self._n_hashes = max(1, round(n_bits / max(capacity, 1) * log(2)))
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _indexes(self, value: int) -> list[int]:
+        # Double hashing: n_hashes steps of hash_2 from hash_1, modulo n_bits, of two 64-bit mixes
+        # (SplitMix64) of the integer folded by hash()
+        n_bits = self._n_bits
+        hash_1 = _mix(hash(value) & M64)
+        hash_2 = _mix(hash_1) | 1
+        return [ndx % n_bits for ndx in range(hash_1, hash_1 + self._n_hashes * hash_2, hash_2)]
+
+    def __contains__(self, value: int) -> bool:
+        bits = self._bits
+        return all(bits[ndx >> 3] >> (ndx & 7) & 1 for ndx in self._indexes(value))
+
+    def add(self, value: int) -> bool:
+        """
+        Add an integer, unless it may already be in the filter
+
+        :param value: Integer to add
+        :return bool, whether value was added
+        """
+        bits = self._bits
+        added = False
+        for ndx in self._indexes(value):
+            if not bits[ndx >> 3] >> (ndx & 7) & 1:
+                bits[ndx >> 3] |= 1 << (ndx & 7)
+                added = True
+        self._len += added
+        return added
+
+
+def _mix(value: int) -> int:
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & M64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & M64
+    return value ^ (value >> 31)
+
+
+class UniquePuid:
+    """
+    Generates `puid`s like a `Puid`, but never one already generated by this instance
+    """
+
+    def __init__(
+        self,
+        rand_id: Puid | None = None,
+        dedupe: Dedupe = "exact",
+        capacity: int = DEFAULT_CAPACITY,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        max_bytes: int | None = None,
+    ) -> None:
+        """
+        :param rand_id: `Puid` to generate with, defaults to `Puid()`
+        :param dedupe: "exact" to keep every `puid` generated, or "bloom" for a Bloom filter of
+            fixed size
+        :param capacity: Number of `puid`s expected to be generated, which sizes the set or filter
+        :param false_positive_rate: Rate of `puid`s skipped by a Bloom filter at capacity
+        :param max_bytes: Bound on the size of a Bloom filter
+        """
+        self.rand_id = Puid() if rand_id is None else rand_id
+        self.dedupe = dedupe
+        self._n_values = self.rand_id.codec.n_values
+        self._seen: IntSet | BloomFilter | set[int]
+        match dedupe:
+            case "exact" if self._n_values <= M64:
+                self._seen = IntSet(capacity)
+                self._add = self._seen.add
+            case "exact":
+                seen = self._seen = set()
+
+                def add(value: int) -> bool:
+                    if value in seen:
+                        return False
+                    seen.add(value)
+                    return True
+
+                self._add = add
+            case "bloom":
+                self._seen = BloomFilter(capacity, false_positive_rate, max_bytes)
+                self._add = self._seen.add
+            case other:
+                raise ValueError(f"unsupported dedupe: {other!r}")
+
+    def __len__(self) -> int:
+        """
+        Number of `puid`s generated or added
+        """
+        return len(self._seen)
+
+    def __contains__(self, puid: str) -> bool:
+        """
+        Whether a `puid` was generated or added. A Bloom filter may report false positives
+        """
+        return self.rand_id.is_valid(puid) and self.rand_id.decode(puid) in self._seen
+
+    def add(self, puid: str) -> bool:
+        """
+        Mark a `puid`, such as one from a previous run, as seen
+
+        :param puid: `puid` to add
+        :return bool, whether `puid` was unseen
+        """
+        return self._add(self.rand_id.decode(puid))
+
+    def generate(self) -> str:
+        return self.generate_many(1)[0]
+
+    def generate_many(self, n: int) -> list[str]:
+        """
+        Generate `n` `puid`s at once, none of them seen before
+
+        :param n: Number of `puid`s to generate
+        :return list[str]
+        """
+        if n <= 0:
+            return []
+        puid_len = len(self.rand_id)
+        chars = self.rand_id.codec.table.encode(self.rand_id.codec.codes(self.generate_many_ints(n)))
+        return [chars[ndx:ndx + puid_len] for ndx in range(0, n * puid_len, puid_len)]
+
+    def generate_many_ints(self, n: int) -> list[int]:
+        """
+        Generate the integers of `n` `puid`s at once, none of them seen before
+
+        :param n: Number of integers to generate
+        :return list[int]
+        """
+        add = self._add
+        is_bloom = isinstance(self._seen, BloomFilter)
+        values: list[int] = []
+        n_regenerated = 0
+        while len(values) < n:
+            if len(self._seen) == self._n_values:
+                raise UniquenessError("every puid has been generated")
+            for value in self.rand_id.generate_many_ints(n - len(values)):
+                if add(value):
+                    values.append(value)
+                    n_regenerated = 0
+                elif is_bloom:
+                    n_regenerated += 1
+                    if MAX_REGENERATED < n_regenerated:
+                        raise UniquenessError("Bloom filter is too full to find an unseen puid")
+        return values
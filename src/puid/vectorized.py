@@ -0,0 +1,161 @@
+from math import ceil, log2
+
+try:
+    import numpy as np
+except ImportError as error:
+    error.add_note("Did you forget to install this package with the 'numpy' extra?")
+    raise
+
+from puid.bits import DEFAULT_BUFFER_LEN, value_shifts
+from puid.puid_error import EntropyError
+
+# Upper bound on entropy bytes read, unpacked and sliced per block
+BLOCK_LEN = 1 << 18
+
+# Bits of entropy covered by each chaser when walking the slice offsets of a block
+SEGMENT_LEN = 1 << 10
+
+#  NumPy counterpart to `bits.muncher`, slicing the very same values from the same entropy bits.
+#
+#  A block of entropy is unpacked into bits and the n-bit value at *every* bit offset is computed
+#  at once. The offset of each slice depends on the values rejected before it, as a rejected value
+#  only advances the minimal bits given by `bit_shifts`. So the walk over offsets is split into
+#  segments of SEGMENT_LEN bits, all walked at the same time:
+#
+#    1. Since no slice advances more than n bits, the walk enters each segment at one of its first
+#       n offsets. A chaser starts at each of these and records where it leaves the segment.
+#    2. Following the exits from the start of the block picks the true entry of every segment.
+#    3. One chaser per segment walks again from its true entry, marking the sliced offsets.
+#
+#  When the number of characters is a power of 2 no value is rejected, so slices are simply
+#  consecutive n-bit fields.
+
+
+def numpy_muncher(n_chars, puid_len, entropy_fn, buffer_len=DEFAULT_BUFFER_LEN, stats=None):
+    n_bits_per_char = ceil(log2(n_chars))
+    shifts = np.array(value_shifts(n_chars), dtype=np.intp)
+    value_mask = (1 << n_bits_per_char) - 1
+    weights = 1 << np.arange(n_bits_per_char - 1, -1, -1, dtype=np.uint8)
+
+    # Expected entropy bits per accepted value, overestimating rejected value shifts as n bits
+    n_bits_per_value = n_bits_per_char * (1 << n_bits_per_char) / n_chars
+
+    carry = np.empty(0, dtype=np.uint8)
+    pending = np.empty(0, dtype=np.uint8)
+    pending_offset = 0
+
+    def sliced_values(bits):
+        # Returns the accepted values sliced from bits, and the offset of the next slice
+        n_offsets = len(bits) - n_bits_per_char + 1
+        if n_offsets <= 0:
+            return pending[:0], 0
+
+        if n_chars.bit_count() == 1:
+            n_values = len(bits) // n_bits_per_char
+            fields = bits[:n_values * n_bits_per_char].reshape(n_values, n_bits_per_char)
+            return fields @ weights, n_values * n_bits_per_char
+
+        # n-bit value at every offset, from 16-bit windows over the entropy bytes
+        data = np.packbits(bits)
+        windows = (data.astype(np.uint16) << 8)
+        windows[:-1] |= data[1:]
+
+        # Values extend past the last offset, so chasers index them without bounds checks
+        n_table = n_offsets + n_bits_per_char + 1
+        values = np.empty(max(8 * len(windows), n_table), dtype=np.uint8)
+        for bit in range(8):
+            values[bit:8 * len(windows):8] = (windows >> (16 - n_bits_per_char - bit)) & value_mask
+        values[n_offsets:] = 0
+
+        advance = shifts[values]
+
+        n_segments = ceil(n_offsets / SEGMENT_LEN)
+        starts = np.arange(n_segments, dtype=np.intp) * SEGMENT_LEN
+        limits = np.minimum(starts + SEGMENT_LEN, n_offsets)
+
+        exits = starts[:, None] + np.arange(n_bits_per_char, dtype=np.intp)
+        segment_limits = limits[:, None]
+        while (active := exits < segment_limits).any():
+            exits += np.where(active, advance[exits], 0)
+
+        entries = []
+        offset = 0
+        for segment, start in enumerate(starts.tolist()):
+            entries.append(offset)
+            offset = int(exits[segment, offset - start])
+            if n_offsets <= offset:
+                break
+
+        offsets = np.array(entries, dtype=np.intp)
+        limits = limits[:len(entries)]
+        sliced = np.zeros(n_offsets, dtype=bool)
+        while (active := offsets < limits).any():
+            sliced[offsets[active]] = True
+            offsets += np.where(active, advance[offsets], 0)
+
+        values = values[:n_offsets][sliced]
+        return values[values < n_chars], offset
+
+    def refill(n_needed):
+        # Values of the next block of entropy
+        nonlocal carry
+        n_read = min(max(ceil(n_needed * n_bits_per_value / 8) + 1, buffer_len), BLOCK_LEN)
+
+        if stats is not None:
+            stats.bits_carried += len(carry)
+        fresh = np.frombuffer(entropy_fn(n_read), dtype=np.uint8)
+        if len(fresh) == 0:
+            raise EntropyError('entropy source is exhausted')
+
+        bits = np.concatenate((carry, np.unpackbits(fresh)))
+        values, offset = sliced_values(bits)
+        carry = bits[offset:]
+        if stats is not None:
+            stats.bits_sliced += offset
+        return values
+
+    def codes_muncher(n_puids=1):
+        nonlocal pending, pending_offset
+        n_values = puid_len * n_puids
+        end = pending_offset + n_values
+        if end <= len(pending):
+            codes = pending[pending_offset:end]
+            pending_offset = end
+            return codes.reshape(n_puids, puid_len)
+
+        # Blocks are concatenated once per call, and only the last one is kept as pending
+        blocks = [pending[pending_offset:]]
+        n_blocked = len(blocks[0])
+        while n_blocked < n_values:
+            blocks.append(refill(n_values - n_blocked))
+            n_blocked += len(blocks[-1])
+        pending = blocks[-1]
+        pending_offset = len(pending) - (n_blocked - n_values)
+        blocks[-1] = pending[:pending_offset]
+        return np.concatenate(blocks).reshape(n_puids, puid_len)
+
+    return codes_muncher
+
+
+def codes_array(codes, characters, kind):
+    """
+    Convert a matrix of `puid` codes, one row per `puid`, into an array of kind
+
+      - "codes": the matrix itself, with the index into `characters` of each character
+      - "S": fixed-width bytes `puid`s, for ASCII characters only
+      - "U": fixed-width str `puid`s
+    """
+    n_puids, puid_len = codes.shape
+    match kind:
+        case "codes":
+            return codes
+        case "S":
+            if not characters.isascii():
+                raise ValueError("'S' arrays require ASCII characters")
+            table = np.frombuffer(characters.encode('ascii'), dtype=np.uint8)
+            return np.ascontiguousarray(table[codes]).view(f'S{puid_len}').reshape(n_puids)
+        case "U":
+            table = np.array([ord(char) for char in characters], dtype=np.uint32)
+            return np.ascontiguousarray(table[codes]).view(f'U{puid_len}').reshape(n_puids)
+        case other:
+            raise ValueError(f"unknown array kind: {other!r}")
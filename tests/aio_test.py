@@ -0,0 +1,81 @@
+import asyncio
+import secrets
+import threading
+
+import pytest
+
+from puid import Charsets
+from puid import Puid
+
+
+def test_agenerate(util):
+    data = bytes(range(256)) * 8
+    rand_id = Puid(charset=Charsets.ALPHANUM, entropy_source=util.static_bytes_fn(data))
+    rand_id.prefetch(low_watermark=2, high_watermark=5)
+
+    async def agenerate():
+        return [await rand_id.agenerate() for _ in range(12)]
+
+    same_id = Puid(charset=Charsets.ALPHANUM, entropy_source=util.static_bytes_fn(data))
+    assert asyncio.run(agenerate()) == [same_id.generate() for _ in range(12)]
+
+
+def test_astream():
+    rand_id = Puid(bitwidth=64)
+
+    async def astream():
+        return [id async for id in rand_id.astream(1000)]
+
+    ids = asyncio.run(astream())
+    assert len(set(ids)) == 1000
+    assert all(len(id) == len(rand_id) for id in ids)
+
+
+def test_entropy_off_loop():
+    loop_thread = threading.get_ident()
+    entropy_threads = set()
+
+    def entropy_source(n_bytes):
+        entropy_threads.add(threading.get_ident())
+        return secrets.token_bytes(n_bytes)
+
+    rand_id = Puid(entropy_source=entropy_source)
+    entropy_threads.clear()
+
+    async def agenerate():
+        return [await rand_id.agenerate() for _ in range(10)]
+
+    assert len(asyncio.run(agenerate())) == 10
+    assert entropy_threads and loop_thread not in entropy_threads
+
+
+def test_cancel_one_waiter():
+    started = threading.Event()
+
+    def entropy_source(n_bytes):
+        started.set()
+        # Slow enough for both waiters to wait on the same refill
+        threading.Event().wait(0.2)
+        return secrets.token_bytes(n_bytes)
+
+    rand_id = Puid(entropy_source=entropy_source)
+
+    async def agenerate():
+        cancelled = asyncio.create_task(rand_id.agenerate())
+        waiter = asyncio.create_task(rand_id.agenerate())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        cancelled.cancel()
+        id = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return id
+
+    assert len(asyncio.run(agenerate())) == len(rand_id)
+
+
+def test_invalid_watermarks():
+    with pytest.raises(ValueError):
+        Puid().prefetch(low_watermark=10, high_watermark=10)
+    with pytest.raises(ValueError):
+        Puid().prefetch(low_watermark=-1)
@@ -0,0 +1,24 @@
+import json
+import os
+
+import pytest
+
+from puid.bench import cases, run_case
+
+# A quick pass over every case by default. For meaningful numbers, run for instance
+#
+#   PUID_BENCH_COUNT=100000 pytest -s tests/bench_test.py
+BENCH_COUNT = int(os.environ.get('PUID_BENCH_COUNT', 50))
+
+
+def case_id(case):
+    return f'{case.name}-{case.bitwidth}-{case.backend}-{case.strategy}-{case.mode}'
+
+
+@pytest.mark.parametrize("case", cases(), ids=case_id)
+def test_bench(case):
+    result = run_case(case, BENCH_COUNT, repeat=1)
+    print(json.dumps(result))
+    assert 0 < result['ids_per_sec']
+    assert case.bitwidth / 8 <= result['entropy_bytes_per_id']
+    assert 0 < result['peak_bytes_per_id']
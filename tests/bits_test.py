@@ -1,4 +1,9 @@
-from puid.bits import bit_shifts
+import random
+from math import ceil, log2
+
+import pytest
+
+from puid.bits import bit_shifts, muncher
 from puid.chars import Charset, Charsets
 
 
@@ -20,3 +25,28 @@ def test_bit_shifts_non_pow_2():
     check_predefined(Charsets.ALPHANUM, [(61, 6), (63, 5)])
     check_predefined(Charsets.ALPHANUM_LOWER, [(35, 6), (39, 4), (47, 3), (63, 2)])
     check_predefined(Charsets.SAFE_ASCII, [(89, 7), (91, 6), (95, 5), (127, 2)])
+
+
+def reference_values(n_chars, data, n_values):
+    # Slices values one bit at a time, shifting rejected values as per `bit_shifts`
+    n_bits_per_char = ceil(log2(n_chars))
+    bits = ''.join(f'{byte:08b}' for byte in data)
+    shifts = bit_shifts(n_chars)
+    values = []
+    offset = 0
+    while len(values) < n_values:
+        value = int(bits[offset:offset + n_bits_per_char], 2)
+        if value < n_chars:
+            values.append(value)
+            offset += n_bits_per_char
+        else:
+            offset += next(bits for max_value, bits in shifts if value <= max_value)
+    return values
+
+
+@pytest.mark.parametrize("n_chars", [3, 10, 26, 36, 62, 90, 100, 200])
+def test_muncher_slicing(util, n_chars):
+    data = random.Random(n_chars).randbytes(4096)
+    bits_muncher = muncher(n_chars, 10, util.static_bytes_fn(data), buffer_len=64)
+    values = bits_muncher() + bits_muncher(99) + bits_muncher(100)
+    assert values == reference_values(n_chars, data, 2000)
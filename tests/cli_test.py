@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+pytest.importorskip("funparse")
+
+from puid import Charsets
+from puid import Puid
+from puid.cli import Format, main, write_ids
+from puid.puid_error import BitsError, TotalRiskError
+
+
+def test_write_plain(util):
+    hex_id = Puid(bitwidth=12, charset=Charsets.HEX_UPPER,
+                  entropy_source=util.fixed_bytes("c7 c9 00 2a bd"))
+    file = io.StringIO()
+    write_ids(hex_id, 3, Format.PLAIN, file)
+    assert file.getvalue() == "C7C\n900\n2AB\n"
+
+
+def test_write_formats():
+    rand_id = Puid(bitwidth=32, charset=Charsets.SYMBOL)
+    for format in Format:
+        file = io.StringIO()
+        write_ids(rand_id, 100, format, file)
+        lines = file.getvalue().splitlines()
+        match format:
+            case Format.PLAIN | Format.PG_COPY:
+                ids = lines
+            case Format.CSV:
+                assert lines[0] == 'id'
+                assert all(line[0] == line[-1] == '"' for line in lines[1:])
+                ids = [line[1:-1] for line in lines[1:]]
+            case Format.JSONL:
+                ids = [json.loads(line)['id'] for line in lines]
+        assert len(ids) == 100
+        assert all(len(id) == len(rand_id) and rand_id.charset.contains_charset(id) for id in ids)
+
+
+def test_main(tmp_path, capsys):
+    output = tmp_path / 'ids.csv'
+    argv = ['puid', '--bits', '64', '--charset', 'alphanum', '--count', '40000', '--format', 'csv',
+            '--output', str(output), '--rate']
+    assert main(argv) == 0
+    lines = output.read_text().splitlines()
+    assert lines[0] == 'id'
+    assert len(set(lines[1:])) == 40000
+    assert 'puids/sec' in capsys.readouterr().err
+
+
+def test_main_stdout(capsys):
+    assert main(['puid', '--total', '1000', '--risk', '1e12', '--chars', 'dingosky']) == 0
+    id = capsys.readouterr().out.strip()
+    assert set(id) <= set('dingosky') and len(id) == 20
+
+
+def test_main_invalid_entropy():
+    with pytest.raises(BitsError):
+        main(['puid', '--bits', '64', '--total', '1000', '--risk', '1e12'])
+    with pytest.raises(TotalRiskError):
+        main(['puid', '--total', '1000'])
@@ -0,0 +1,178 @@
+import sys
+
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.codec import codec
+from puid.puid_error import InvalidPuid
+
+
+def test_codec():
+    hex_codec = codec(Charsets.HEX.value, 4)
+    assert hex_codec.n_values == 1 << 16
+    assert hex_codec.n_bytes == 2
+    assert hex_codec.decode_int('00ff') == 255
+    assert hex_codec.decode_bytes('c0de') == b'\xc0\xde'
+    assert hex_codec.encode(255) == '00ff'
+    assert hex_codec.encode(b'\xc0\xde') == 'c0de'
+
+    # 'd' is 0 and 'y' is 7
+    custom_codec = codec('dingosky', 3)
+    assert custom_codec.n_bytes == 2
+    assert custom_codec.decode_int('ddy') == 7
+    assert custom_codec.decode_int('yyy') == 511
+    assert custom_codec.encode(8) == 'did'
+    assert custom_codec.codes([0, 8, 511]) == bytes([0, 0, 0, 0, 1, 0, 7, 7, 7])
+
+
+@pytest.mark.parametrize("charset", [*Charsets, 'dîngøsky☺⚡✓→€£¥'])
+def test_codec_round_trip(charset):
+    if charset == Charsets.CUSTOM:
+        return
+    rand_id = Puid(charset=charset)
+    for id in rand_id.generate_many(100):
+        value = rand_id.codec.decode_int(id)
+        assert 0 <= value < rand_id.codec.n_values
+        assert rand_id.codec.encode(value) == id
+        assert rand_id.codec.encode(rand_id.codec.decode_bytes(id)) == id
+
+    assert rand_id.codec.encode(0) == rand_id.charset.characters[0] * len(rand_id)
+    assert rand_id.codec.encode(rand_id.codec.n_values - 1) == (rand_id.charset.characters[-1] *
+                                                                 len(rand_id))
+
+
+@pytest.mark.parametrize("charset", [Charsets.SAFE64, Charsets.BASE32, "dingosky", "abcd"])
+@pytest.mark.parametrize("bitwidth", [8, 64, 128])
+def test_codec_codes_in_bulk(charset, bitwidth):
+    rand_id = Puid(bitwidth=bitwidth, charset=charset)
+    values = rand_id.generate_many_ints(100) + [0, rand_id.codec.n_values - 1]
+    codes = rand_id.codec.codes(values)
+    assert codes == b''.join(rand_id.codec.codes([value]) for value in values)
+    assert rand_id.codec.table.encode(codes[:len(rand_id)]) == rand_id.codec.encode(values[0])
+
+
+def test_codec_256_chars():
+    # Every byte is a code, including NOT_A_CHAR
+    rand_id = Puid(bitwidth=16, charset=''.join(chr(256 + code) for code in range(256)))
+    for value in [0, 255, 0xff00, 0xffff, *rand_id.generate_many_ints(100)]:
+        puid = rand_id.codec.encode(value)
+        assert rand_id.is_valid(puid)
+        assert rand_id.decode(puid) == value
+        assert rand_id.codec.decode_bytes(puid) == value.to_bytes(2, 'big')
+    with pytest.raises(InvalidPuid):
+        rand_id.decode('a' + chr(256))
+
+
+@pytest.mark.parametrize("strategy", ["bits", "integer"])
+def test_codec_past_str_digits(strategy):
+    # More decimal digits than int and str convert between
+    rand_id = Puid(bitwidth=20_000, charset=Charsets.DECIMAL, strategy=strategy)
+    assert sys.get_int_max_str_digits() < len(rand_id)
+    id = rand_id.generate()
+    assert len(id) == len(rand_id)
+    value = rand_id.decode(id)
+    assert rand_id.codec.encode(value) == id
+    assert rand_id.generate_many_ints(2)[0] < rand_id.codec.n_values
+
+
+def test_codec_invalid():
+    hex_codec = codec(Charsets.HEX.value, 4)
+    for puid in ['00f', '00ff0', '00fg', '00FF', '00f☺']:
+        with pytest.raises(InvalidPuid):
+            hex_codec.decode_int(puid)
+    with pytest.raises(InvalidPuid):
+        codec('dîngøsky', 2).decode_int('di')
+
+    for value in [-1, 1 << 16]:
+        with pytest.raises(ValueError):
+            hex_codec.encode(value)
+    with pytest.raises(ValueError):
+        hex_codec.encode(b'\x00')
+
+
+def test_generate_int(util):
+    rand_id = Puid(bitwidth=8,
+                   charset="abcd",
+                   entropy_source=util.static_bytes_fn(bytes(range(256))),
+                   strategy="integer")
+    # The integers of the puids the same entropy generates
+    assert rand_id.generate_int() == 0
+    assert rand_id.generate_many_ints(2) == [1, 2]
+    assert rand_id.generate() == 'aaad'
+    assert rand_id.generate_bytes() == b'\x04'
+    assert rand_id.generate_many_bytes(2) == [b'\x05', b'\x06']
+    assert rand_id.generate_many_ints(0) == []
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+@pytest.mark.parametrize("charset", [Charsets.SAFE64, Charsets.ALPHANUM, Charsets.DECIMAL])
+def test_generate_int_bits_strategy(backend, charset):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    rand_id = Puid(charset=charset, backend=backend, track_stats=True)
+    values = rand_id.generate_many_ints(1000)
+    assert all(0 <= value < rand_id.codec.n_values for value in values)
+    assert len(set(values)) == 1000
+    assert all(len(value) == rand_id.codec.n_bytes for value in rand_id.generate_many_bytes(10))
+
+    stats = rand_id.stats()
+    assert stats.puids == 1010
+    assert stats.bits_used <= stats.bits_sliced
+
+
+def test_is_valid():
+    rand_id = Puid(bitwidth=16, charset=Charsets.HEX)
+    assert rand_id.is_valid('c0de')
+    assert rand_id.decode('c0de') == 0xc0de
+    for puid in ['c0d', 'c0de0', 'C0DE', 'c0dé', 'c0d\n', '']:
+        assert not rand_id.is_valid(puid)
+        with pytest.raises(InvalidPuid):
+            rand_id.decode(puid)
+
+    unicode_id = Puid(bitwidth=8, charset='dîngøsky')
+    assert unicode_id.is_valid('dîø')
+    assert unicode_id.decode('ddî') == 1
+    assert not unicode_id.is_valid('dia')
+    assert not unicode_id.is_valid('dîøy')
+
+
+@pytest.mark.parametrize("charset", [Charsets.HEX, Charsets.SAFE_ASCII, 'dîngøsky☺⚡✓→€£¥'])
+def test_is_valid_many(charset):
+    rand_id = Puid(charset=charset)
+    ids = rand_id.generate_many(100)
+    assert rand_id.is_valid_many(ids) == [True] * 100
+    buffer = ''.join(id + '\n' for id in ids).encode('utf-8')
+    assert rand_id.is_valid_many(buffer) == [True] * 100
+    assert rand_id.is_valid_many(bytearray(buffer[:-1])) == [True] * 100
+
+    # Invalid characters, at either end, and invalid lengths
+    invalid = {
+        3: '\t' + ids[3][1:],
+        5: ids[5][:-1] + '"',
+        10: ids[10][:-1],
+        20: ids[20] + ids[20][0],
+        30: '',
+    }
+    ids = [invalid.get(ndx, id) for ndx, id in enumerate(ids)]
+    expected = [ndx not in invalid for ndx in range(100)]
+    assert rand_id.is_valid_many(ids) == expected
+    assert rand_id.is_valid_many('\n'.join(ids).encode('utf-8')) == expected
+
+    # Invalid characters only, so every puid has the expected length
+    ids[10] = ids[11][:-1] + '"'
+    ids[20] = ids[21][:-1] + '"'
+    del ids[30]
+    expected = [ndx not in invalid for ndx in range(100) if ndx != 30]
+    assert rand_id.is_valid_many(ids) == expected
+    assert rand_id.is_valid_many('\n'.join(ids).encode('utf-8')) == expected
+
+    # Newlines and non-ASCII characters within puids
+    ids[10] = ids[11][:-1] + '\n'
+    ids[20] = ids[21][:-1] + 'é'
+    assert rand_id.is_valid_many(ids) == expected
+
+    assert rand_id.is_valid_many([]) == []
+    assert rand_id.is_valid_many(b'') == []
+    assert rand_id.is_valid_many(b'\n') == [False]
+    assert rand_id.is_valid_many(b'\xff' * len(rand_id)) == [False]
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.drbg import Drbg
+
+
+def test_drbg_seeded():
+    drbg = Drbg(seed=b'seed', block_len=64)
+    entropy = drbg(1000)
+    assert len(entropy) == 1000
+    # Requests of any sizes, across blocks, return the same stream
+    same = Drbg(seed=b'seed', block_len=64)
+    assert b''.join(same(n_bytes) for n_bytes in [3, 0, 61, 64, 500, 372]) == entropy
+    assert Drbg(seed=b'seed', block_len=64)(1000) == entropy != Drbg(seed=b'seed')(1000)
+    assert Drbg(seed=b'seed2', block_len=64)(1000) != entropy
+    assert Drbg(seed=7)(32) == Drbg(seed=7)(None) != Drbg(seed=-7)(32)
+
+
+def test_drbg_unseeded():
+    assert Drbg()(64) != Drbg()(64)
+    drbg = Drbg(block_len=64)
+    assert len({drbg(16) for _ in range(1000)}) == 1000
+
+
+def test_drbg_reseed():
+    drbg, same = Drbg(seed=1), Drbg(seed=1)
+    drbg(10)
+    same(10)
+    drbg.reseed(b'entropy')
+    same.reseed(b'entropy')
+    assert drbg(100) == same(100)
+    same.reseed()
+    assert drbg(100) != same(100)
+
+    # Seeds from the OS are reseeded every reseed_interval bytes
+    drbg = Drbg(block_len=16, reseed_interval=32)
+    key = drbg._key
+    drbg(48)
+    assert drbg._n_since_seed == 16 and drbg._key != key
+    seeded = Drbg(seed=1, block_len=16, reseed_interval=32)
+    seeded(1000)
+    assert seeded._n_since_seed == 1008
+
+
+@pytest.mark.parametrize("strategy", ["bits", "integer"])
+def test_drbg_puid(strategy):
+    ids = Puid(charset=Charsets.ALPHANUM, entropy_source=Drbg(seed=1),
+               strategy=strategy).generate_many(10)
+    assert ids == Puid(charset=Charsets.ALPHANUM, entropy_source=Drbg(seed=1),
+                       strategy=strategy).generate_many(10)
+    assert len(set(ids)) == 10
+
+
+def test_drbg_threads():
+    drbg = Drbg(block_len=256)
+    chunks = []
+
+    def draw():
+        chunks.extend(drbg(24) for _ in range(1000))
+
+    threads = [threading.Thread(target=draw) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(chunks)) == 4000
+
+
+def test_drbg_invalid():
+    with pytest.raises(ValueError):
+        Drbg(block_len=0)
+    with pytest.raises(ValueError):
+        Drbg(reseed_interval=0)
+    with pytest.raises(ValueError):
+        Drbg()(-1)
@@ -1,5 +1,5 @@
 from puid.chars import Charsets, Charset
-from puid.encoder import get_encoder
+from puid.encoder import chars_table, get_encoder
 
 
 def encoder_chars(chars: Charsets) -> None:
@@ -29,3 +29,26 @@ def test_encoders():
     encoder_chars(Charsets.SAFE64)
     encoder_chars(Charsets.SYMBOL)
     encoder_chars(Charsets.WORD_SAFE32)
+
+
+def test_chars_tables():
+    for chars in Charsets:
+        if chars == Charsets.CUSTOM:
+            continue
+        table = chars_table(chars.value)
+        assert table.is_ascii
+        assert table.encode(range(len(chars))) == chars.value
+        assert table.encode_utf8(range(len(chars))) == chars.value.encode('ascii')
+
+
+def test_unicode_chars_table():
+    table = chars_table('dîngøsky:￦')
+    assert not table.is_ascii
+    assert table.encode([9, 3, 1, 9, 9, 2, 1, 9]) == '￦gî￦￦nî￦'
+    assert table.encode_utf8([1, 9]) == 'î￦'.encode('utf-8')
+    assert table.utf8[4] == 'ø'.encode('utf-8')
+
+
+def test_256_chars_table():
+    chars = "".join(chr(n + 256) for n in range(256))
+    assert chars_table(chars).encode(range(256)) == chars
@@ -1,11 +1,20 @@
+import math
+
 import pytest
 
 from puid.chars import Charset, Charsets
 from puid.chars_error import InvalidChars
+from puid import Puid
 from puid.entropy import bits_for_len
 from puid.entropy import bits_for_total_risk
 from puid.entropy import bits_per_char
+from puid.entropy import expected_repeats
 from puid.entropy import len_for_bits
+from puid.entropy import plan_puid
+from puid.entropy import rank_charsets
+from puid.entropy import risk_for_bits_total
+from puid.entropy import simulate_risk
+from puid.entropy import total_for_bits_risk
 from puid.puid_error import TotalRiskError
 
 
@@ -60,3 +69,130 @@ def test_bits_for_len(chars, len, expect):
                           (Charset.predefined(Charsets.BASE32_HEX), 62, 13)])
 def test_len_for_bits(chars, bits, expect):
     assert len_for_bits(chars, bits) == expect
+
+
+@pytest.mark.parametrize("total, risk", [
+    (100, 100),
+    (999, 1000),
+])
+def test_inverse_total_risk(total, risk):
+    bits = bits_for_total_risk(total, risk)
+    assert risk_for_bits_total(bits, total) == pytest.approx(risk)
+    assert total_for_bits_risk(bits, risk) == pytest.approx(total)
+
+
+def test_inverse_total_risk_degenerate():
+    # No pairs of puids among 0 or 1 of them, so never a repeat
+    for total in [0, 1, 0.5]:
+        assert risk_for_bits_total(64, total) == float('inf')
+    for risk in [0, -1]:
+        with pytest.raises(TotalRiskError):
+            total_for_bits_risk(64, risk)
+    with pytest.raises(TotalRiskError):
+        risk_for_bits_total(64, -1)
+
+
+@pytest.mark.parametrize("total, risk", [
+    (1e4, 1e3),
+    (100000, 1e12),
+    (10.0e9, 1.0e21),
+])
+def test_inverse_total_risk_large(total, risk):
+    # Large totals approximate total * (total - 1) pairs by total ** 2
+    bits = bits_for_total_risk(total, risk)
+    assert risk_for_bits_total(bits, total) == pytest.approx(risk, rel=1e-3)
+    assert total_for_bits_risk(bits, risk) == pytest.approx(total, rel=1e-3)
+
+
+def test_expected_repeats():
+    assert expected_repeats(32, 1, 1) == 0
+    assert expected_repeats(32, 2, 1) == 2**-32
+    # A puid per second over a day
+    assert expected_repeats(16, 1, 24 * 3600) == pytest.approx(24 * 3600 * (24 * 3600 - 1) / 2**17)
+    assert expected_repeats(40, 1000, 3600) == pytest.approx(1 / risk_for_bits_total(40, 3600_000))
+
+
+def test_inverse_arrays():
+    np = pytest.importorskip("numpy")
+    bits = np.array([32.0, 48.0, 64.0])
+    totals = np.array([1e3, 1e5, 1e7])
+    risks = risk_for_bits_total(bits, totals)
+    assert risks.shape == (3, )
+    assert total_for_bits_risk(bits, risks) == pytest.approx(totals)
+    assert expected_repeats(bits, totals, 1) == pytest.approx(1 / risks)
+
+
+def test_simulate_risk():
+    np = pytest.importorskip("numpy")
+    # 2 ** 24 puids, 1000 at a time, repeat about 1 time in 34
+    rand_id = Puid(bitwidth=24, charset=Charsets.HEX)
+    expected = risk_for_bits_total(24, 1000)
+    assert simulate_risk(rand_id, 1000, trials=20_000, seed=1) == pytest.approx(expected, rel=0.1)
+    risks = simulate_risk(rand_id, np.array([1, 1000, 4000]), trials=2000, seed=1)
+    assert risks[0] == float('inf')
+    # Repeats are likely, so the chance of any is below the expected repeats
+    expected_chance = 1 - math.exp(-1 / risk_for_bits_total(24, 4000))
+    assert risks[1] > risks[2] == pytest.approx(1 / expected_chance, rel=0.1)
+    assert simulate_risk(rand_id, 1000, trials=2000, sampler="puid") == pytest.approx(expected,
+                                                                                       rel=0.5)
+
+
+def test_simulate_risk_puid_sampler():
+    pytest.importorskip("numpy")
+    # Slicing and rejecting bits, as generate does
+    # 62 ** 3 puids, 200 at a time, repeat about 1 time in 12
+    rand_id = Puid(bitwidth=14, charset=Charsets.ALPHANUM)
+    expected = risk_for_bits_total(rand_id.bitwidth, 200)
+    assert simulate_risk(rand_id, 200, trials=2000, sampler="puid") == pytest.approx(expected,
+                                                                                      rel=0.4)
+    # Only the puids of rand_id expose a broken entropy source
+    broken_id = Puid(bitwidth=20, charset=Charsets.ALPHANUM, entropy_source=bytes)
+    assert simulate_risk(broken_id, 10, trials=100, sampler="puid") == 1.0
+    assert simulate_risk(broken_id, 10, trials=100) > 1000
+
+
+def test_simulate_invalid():
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        simulate_risk(Puid(bitwidth=72, charset=Charsets.HEX), 1000)
+    with pytest.raises(ValueError):
+        simulate_risk(Puid(bitwidth=24), 1000, trials=0)
+    with pytest.raises(ValueError):
+        simulate_risk(Puid(bitwidth=24), 1000, sampler="os")
+
+
+def test_rank_charsets():
+    candidates = rank_charsets(1e6, 1e12)
+    assert len(candidates) == 2 * (len(Charsets) - 1)
+    assert all(candidate.bitwidth >= candidate.bits for candidate in candidates)
+    assert candidates[0].charset == Charsets.SAFE_ASCII
+    assert [candidate.utf8_bytes for candidate in candidates] == sorted(
+        candidate.utf8_bytes for candidate in candidates)
+
+    # Power of 2 charsets reject nothing, so consume just the bits of their characters
+    base32 = next(candidate for candidate in candidates
+                  if candidate.charset == Charsets.BASE32 and candidate.strategy == "bits")
+    assert base32.entropy_bytes == base32.bitwidth / 8
+    by_entropy = rank_charsets(1e6, 1e12, rank_by="entropy")
+    assert by_entropy[0].entropy_bytes == min(candidate.entropy_bytes for candidate in candidates)
+    assert by_entropy[0].charset != Charsets.SAFE_ASCII
+
+    custom = rank_charsets(1e6, 1e12, charsets=['dîngøsky', Charsets.HEX], strategies=["bits"])
+    assert [candidate.charset for candidate in custom] == [Charsets.HEX, 'dîngøsky']
+    assert custom[1].utf8_bytes == custom[1].len * 10 / 8
+
+
+def test_rank_charsets_by_speed():
+    candidates = rank_charsets(1e6, 1e12, charsets=[Charsets.HEX, Charsets.ALPHANUM],
+                               rank_by="speed", measure=100)
+    assert all(0 < candidate.ns_per_id for candidate in candidates)
+    assert [candidate.ns_per_id for candidate in candidates] == sorted(
+        candidate.ns_per_id for candidate in candidates)
+    assert rank_charsets(1e6, 1e12)[0].ns_per_id is None
+
+
+def test_plan_puid():
+    rand_id = plan_puid(1e6, 1e12, charsets=[Charsets.HEX, Charsets.SAFE64], track_stats=True)
+    assert rand_id.charset.kind == Charsets.SAFE64
+    assert risk_for_bits_total(rand_id.bitwidth, 1e6) >= 1e12
+    assert rand_id.is_valid(rand_id.generate())
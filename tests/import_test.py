@@ -0,0 +1,52 @@
+import compileall
+import os
+
+import puid
+from puid.bench import import_times
+
+# Modules only imported once a feature needing them is used
+LAZY_MODULES = (
+    'asyncio',
+    'concurrent.futures',
+    'funparse',
+    'numpy',
+    'ordered_set',
+    'puid.encoders',
+    'secrets',
+)
+
+# Standard library modules imported by `import puid`
+STDLIB_MODULES = (
+    '__future__',
+    'dataclasses',
+    'enum',
+    'functools',
+    'importlib',
+    'math',
+    'os',
+    're',
+    'string',
+    'sys',
+    'threading',
+    'typing',
+    'weakref',
+)
+# Budget of the import time of puid's own modules, relative to the import time of STDLIB_MODULES
+IMPORT_TIME_RATIO = 0.35
+
+
+def test_import_puid():
+    times = import_times('puid')
+    assert not [name for name in times if name.startswith(LAZY_MODULES)]
+
+
+def test_import_time():
+    # Time imports from bytecode, as installed, not compiles of the sources
+    compileall.compile_dir(os.path.dirname(puid.__file__), quiet=1)
+
+    def ratio():
+        times = import_times('puid', preload=STDLIB_MODULES)
+        return times['puid'] / sum(times.get(name, 0) for name in STDLIB_MODULES)
+
+    # The least of several runs, as other processes only slow imports down
+    assert min(ratio() for _ in range(5)) < IMPORT_TIME_RATIO
@@ -0,0 +1,61 @@
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.integer import integer_draw
+from puid.puid_error import EntropyError
+
+
+def test_integer_draw():
+    # 9 values: 5 bits accept 27 draws of 32, 4 bits only 9 of 16
+    assert integer_draw(3, 2) == (5, 27)
+    # 256 values fit in a byte exactly
+    assert integer_draw(16, 2) == (8, 256)
+    n_bits, limit = integer_draw(257, 1)
+    assert 9 < n_bits and limit % 257 == 0
+    assert integer_draw(62, 22)[0] == 131
+
+
+def test_integer_every_value(util):
+    rand_id = Puid(bitwidth=8,
+                   charset="abcd",
+                   entropy_source=util.static_bytes_fn(bytes(range(256))),
+                   strategy="integer")
+    assert len(rand_id) == 4
+    ids = rand_id.generate_many(256)
+    assert ids[:3] == ["aaaa", "aaab", "aaac"]
+    assert sorted(ids) == ids
+    assert len(set(ids)) == 256
+    with pytest.raises(EntropyError):
+        rand_id.generate()
+
+
+def test_integer_rejection(util):
+    rand_id = Puid(bitwidth=3,
+                   charset="abc",
+                   entropy_source=util.fixed_bytes("1f 05"),
+                   strategy="integer",
+                   track_stats=True)
+    # Draws of 5 bits, least significant first: 31 is rejected, then 8 and 1
+    assert rand_id.generate_many(2) == ["cc", "ab"]
+    stats = rand_id.stats()
+    assert stats.bits_sliced == 15
+    assert stats.bits_rejected == 5
+
+
+@pytest.mark.parametrize("charset", [Charsets.DECIMAL, Charsets.ALPHANUM, Charsets.SAFE_ASCII])
+def test_integer_stats(charset):
+    bits_id = Puid(charset=charset, track_stats=True)
+    integer_id = Puid(charset=charset, track_stats=True, strategy="integer")
+    ids = integer_id.generate_many(2000)
+    bits_id.generate_many(2000)
+
+    assert all(len(id) == len(integer_id) and integer_id.charset.contains_charset(id) for id in ids)
+    assert integer_id.stats().bits_sliced < bits_id.stats().bits_sliced
+
+
+def test_invalid_strategy():
+    with pytest.raises(ValueError):
+        Puid(strategy="digits")
+    with pytest.raises(ValueError):
+        Puid(backend="numpy", strategy="integer")
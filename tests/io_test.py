@@ -0,0 +1,78 @@
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.io import PuidFile, write_file
+
+
+def test_write_file(tmp_path, util):
+    path = tmp_path / 'ids'
+    dingosky_bytes = util.fixed_bytes("c7 c9 00 2a bd 72")
+    dingosky_id = Puid(bitwidth=9, charset="dingosky", entropy_source=dingosky_bytes)
+    assert write_file(path, 5, dingosky_id) == 20
+    assert path.read_bytes() == b"kiy\nooo\nddi\nnsg\nksk\n"
+
+    with PuidFile(path) as ids:
+        assert len(ids) == 5
+        assert ids.puid_len == 3
+        assert ids[0] == "kiy"
+        assert ids[-1] == "ksk"
+        assert ids[1:4] == ["ooo", "ddi", "nsg"]
+        assert list(ids) == ["kiy", "ooo", "ddi", "nsg", "ksk"]
+        with pytest.raises(IndexError):
+            ids[5]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_file_regions(tmp_path, workers):
+    path = tmp_path / 'ids'
+    rand_id = Puid(bitwidth=64, charset=Charsets.ALPHANUM)
+    # Regions of odd sizes, which start within allocation boundaries
+    n_bytes = write_file(path, 5000, rand_id, sep=b'\r\n', workers=workers, chunk=777)
+    assert n_bytes == 5000 * (len(rand_id) + 2)
+
+    with PuidFile(path, sep=b'\r\n') as ids:
+        assert len(ids) == 5000
+        assert len(set(ids)) == 5000
+        assert rand_id.is_valid_many(list(ids)) == [True] * 5000
+        assert ids[4321] == list(ids)[4321]
+
+
+def test_write_file_without_sep(tmp_path):
+    path = tmp_path / 'ids'
+    rand_id = Puid(bitwidth=32, charset=Charsets.HEX)
+    write_file(path, 100, rand_id, sep=b'')
+    with pytest.raises(ValueError):
+        PuidFile(path, sep=b'')
+    with PuidFile(path, sep=b'', puid_len=len(rand_id)) as ids:
+        assert len(ids) == 100
+        assert all(rand_id.is_valid(id) for id in ids)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'ids'
+    assert write_file(path, 0) == 0
+    with PuidFile(path) as ids:
+        assert len(ids) == 0
+        assert list(ids) == []
+
+
+def test_invalid_files(tmp_path):
+    with pytest.raises(ValueError):
+        write_file(tmp_path / 'ids', 10, Puid(charset='dîngøsky'))
+    with pytest.raises(ValueError):
+        write_file(tmp_path / 'ids', 10, chunk=0)
+
+    # The file is left intact
+    path = tmp_path / 'kept'
+    path.write_bytes(b"kiy\n")
+    with pytest.raises(ValueError):
+        write_file(path, -1)
+    assert path.read_bytes() == b"kiy\n"
+
+    path = tmp_path / 'ids'
+    path.write_bytes(b"abc\nabcd\n")
+    with pytest.raises(ValueError):
+        PuidFile(path)
+    with pytest.raises(ValueError):
+        PuidFile(path, sep=b',')
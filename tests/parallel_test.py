@@ -0,0 +1,40 @@
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.parallel import generate, worker_pool, worker_puid
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_generate(ordered):
+    rand_id = Puid(bitwidth=64, charset=Charsets.ALPHANUM)
+    ids = list(generate(2500, rand_id, workers=2, chunk=400, ordered=ordered))
+    assert len(ids) == 2500
+    assert len(set(ids)) == 2500
+    assert all(len(id) == len(rand_id) for id in ids)
+    assert all(rand_id.charset.contains_charset(id) for id in ids)
+
+
+def test_generate_custom_chars():
+    rand_id = Puid(bitwidth=40, charset="dingosky")
+    ids = list(generate(10, rand_id, workers=1, chunk=3))
+    assert len(ids) == 10
+    assert all(len(id) == len(rand_id) and set(id) <= set("dingosky") for id in ids)
+
+
+def test_generate_nothing():
+    assert list(generate(0)) == []
+    with pytest.raises(ValueError):
+        list(generate(10, chunk=0))
+
+
+def _worker_len():
+    return len(worker_puid())
+
+
+def test_worker_pool():
+    rand_id = Puid(bitwidth=40, charset=Charsets.HEX)
+    with worker_pool(rand_id, 1) as executor:
+        assert executor.submit(_worker_len).result() == len(rand_id)
+    with pytest.raises(RuntimeError):
+        worker_puid()
@@ -0,0 +1,38 @@
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.chars_error import InvalidChars
+from puid.plan import PLAN_CACHE_SIZE, plan
+
+
+def test_plan():
+    alphanum_plan = plan(Charsets.ALPHANUM, 128)
+    assert alphanum_plan.puid_len == 22
+    assert alphanum_plan.characters == Charsets.ALPHANUM.value
+    assert alphanum_plan.charset.kind == Charsets.ALPHANUM
+    assert len(alphanum_plan.shifts) == 64
+    assert alphanum_plan.table.chars == Charsets.ALPHANUM.value
+
+
+def test_plan_cached():
+    assert plan("dingosky", 64) is plan("dingosky", 64)
+    assert plan(Charsets.HEX, 64) is not plan(Charsets.HEX, 65)
+    assert plan.cache_info().maxsize == PLAN_CACHE_SIZE
+
+
+def test_plan_hashable():
+    custom_plan = plan("dingosky", 64)
+    assert hash(custom_plan) == hash(plan("dingosky", 64))
+    assert custom_plan != plan("dingosky", 70)
+    # Same characters and length, though planned for a different bitwidth
+    assert plan(Charsets.HEX, 64) == plan(Charsets.HEX, 63)
+
+
+def test_puid_shares_plan():
+    assert Puid(charset=Charsets.SAFE32)._plan is Puid(charset=Charsets.SAFE32)._plan
+
+
+def test_invalid_plan():
+    with pytest.raises(InvalidChars):
+        plan("dingo sky", 64)
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from puid import Charsets, Puid
+from puid.bits import muncher
+from puid.encoder import chars_table
+from puid.pow2 import unpack_bits, unpack_masks
+from puid.puid_error import EntropyError
+
+
+@pytest.mark.parametrize("n_bits", range(1, 9))
+def test_unpack_bits(n_bits):
+    data = random.Random(n_bits).randbytes(n_bits * 40)
+    bits = "".join(format(byte, "08b") for byte in data)
+    values = bytes(int(bits[ndx:ndx + n_bits], 2) for ndx in range(0, len(bits), n_bits))
+    assert unpack_bits(data, n_bits) == values
+    # Masks of each block size are computed once
+    assert unpack_masks(n_bits, 40) is unpack_masks(n_bits, 40)
+
+
+@pytest.mark.parametrize("charset", [
+    Charsets.BASE16,
+    Charsets.BASE32,
+    Charsets.BASE32_HEX,
+    Charsets.BASE32_HEX_UPPER,
+    Charsets.CROCKFORD32,
+    Charsets.HEX,
+    Charsets.HEX_UPPER,
+    Charsets.SAFE32,
+    Charsets.SAFE64,
+    Charsets.WORD_SAFE32,
+    "FT",
+    "ATCG",
+    "dîngøsky",
+    "".join(chr(n + 256) for n in range(128)),
+    "".join(chr(n + 256) for n in range(256)),
+])
+@pytest.mark.parametrize("bitwidth", [7, 24, 65, 128])
+def test_same_ids_as_muncher(util, charset, bitwidth):
+    entropy = random.Random(bitwidth).randbytes(1 << 17)
+    pow2_id = Puid(bitwidth=bitwidth, charset=charset, entropy_source=util.static_bytes_fn(entropy))
+
+    table = chars_table(pow2_id.charset.characters)
+    values = muncher(len(pow2_id.charset), len(pow2_id), util.static_bytes_fn(entropy))
+
+    for _ in range(200):
+        assert pow2_id.generate() == table.encode(values())
+    assert pow2_id.generate_many(1000) == [table.encode(values()) for _ in range(1000)]
+
+
+def test_exhausted_entropy(util):
+    hex_bytes = util.fixed_bytes("c7 c9 00")
+    hex_id = Puid(bitwidth=16, charset=Charsets.HEX, entropy_source=hex_bytes)
+    assert hex_id.generate() == "c7c9"
+    with pytest.raises(EntropyError):
+        hex_id.generate()
+
+
+def test_many_blocks(util):
+    # Batches spanning many capped reads match single puids sliced from the same entropy
+    entropy = random.Random(1).randbytes(1 << 20)
+    batch_id = Puid(charset=Charsets.SAFE64, entropy_source=util.static_bytes_fn(entropy))
+    single_id = Puid(charset=Charsets.SAFE64, entropy_source=util.static_bytes_fn(entropy))
+    ids = batch_id.generate_many(3) + batch_id.generate_many(50_000) + batch_id.generate_many(5)
+    assert ids == [single_id.generate() for _ in range(50_008)]
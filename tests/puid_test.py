@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from puid import Charsets
 from puid import Puid
+from puid.drbg import Drbg
+from puid.puid import INTO_BATCH_LEN
 from puid.chars_error import InvalidChars, NonUniqueChars
 from puid.puid_error import BitsError, TotalRiskError
 
@@ -309,3 +315,174 @@ def test_256_chars():
 def test_repr():
     rand_id = Puid()
     assert isinstance(repr(rand_id), str)
+
+
+def test_generate_many(util):
+    dingosky_bytes = util.fixed_bytes("c7 c9 00 2a bd 72")
+    dingosky_id = Puid(bitwidth=9, charset="dingosky", entropy_source=dingosky_bytes)
+    assert dingosky_id.generate_many(5) == ["kiy", "ooo", "ddi", "nsg", "ksk"]
+    assert dingosky_id.generate_many(0) == []
+
+
+def test_generate_many_with_rejection(util):
+    alpha_lower_bytes = util.fixed_bytes("53 c8 8d e6 3e 27 ef")
+    alpha_lower_id = Puid(bitwidth=14,
+                          charset=Charsets.ALPHA_LOWER,
+                          entropy_source=alpha_lower_bytes)
+    assert alpha_lower_id.generate() == "kpe"
+    assert alpha_lower_id.generate_many(2) == ["igh", "ytx"]
+
+
+def test_generate_iter(util):
+    hex_bytes = util.fixed_bytes("c7 c9 00 2a bd")
+    hex_id = Puid(bitwidth=12, charset=Charsets.HEX_UPPER, entropy_source=hex_bytes)
+    assert list(hex_id.generate_iter(3, batch_size=2)) == ["C7C", "900", "2AB"]
+
+
+def test_generate_into(util):
+    dingosky_bytes = util.fixed_bytes("c7 c9 00 2a bd 72")
+    dingosky_id = Puid(bitwidth=9, charset="dingosky", entropy_source=dingosky_bytes)
+    buffer = bytearray(20)
+    assert dingosky_id.generate_into(buffer, 3) == 12
+    assert dingosky_id.generate_into(memoryview(buffer)[12:], 2, sep=b"") == 6
+    assert buffer == b"kiy\nooo\nddi\nnsgksk\0\0"
+    assert dingosky_id.generate_into(buffer, 0) == 0
+
+
+def test_generate_into_batches():
+    rand_id = Puid(bitwidth=32, charset=Charsets.SAFE64)
+    count = INTO_BATCH_LEN + 3
+    buffer = bytearray(9 * count)
+    assert rand_id.generate_into(buffer, count, sep=b"\r\n") == 8 * count
+    ids = buffer[:8 * count].decode('ascii').split('\r\n')
+    assert ids[-1] == '' and buffer[8 * count:] == bytes(count)
+    assert rand_id.is_valid_many(ids[:-1]) == [True] * count
+
+    with pytest.raises(ValueError):
+        rand_id.generate_into(buffer, len(buffer) // 8 + 1, sep=b"\r\n")
+
+
+def test_generate_into_unicode(util):
+    unicode_bytes = util.fixed_bytes('ec f9 db 7a 33 3d 21 97 a0 c2 bf 92 80 dd 2f 57 12 c1 1a ef')
+    unicode_id = Puid(bitwidth=24, charset='dîngøsky:￦', entropy_source=unicode_bytes)
+    buffer = bytearray(64)
+    n_bytes = unicode_id.generate_into(buffer, 2)
+    assert buffer[:n_bytes].decode('utf-8') == '￦gî￦￦nî￦\nydkîsnsd\n'
+    with pytest.raises(ValueError):
+        unicode_id.generate_into(bytearray(8), 1)
+
+
+def test_generate_iter_unbounded():
+    rand_id = Puid(bitwidth=48)
+    ids = rand_id.generate_iter()
+    assert all(len(next(ids)) == len(rand_id) for _ in range(2000))
+
+
+def test_generate_iter_invalid_batch_size():
+    for batch_size in [0, -1]:
+        with pytest.raises(ValueError):
+            Puid().generate_iter(5, batch_size=batch_size)
+
+
+@pytest.mark.parametrize("charset", [Charsets.ALPHANUM, Charsets.SAFE64])
+def test_buffer_size(util, charset):
+    data = bytes(range(256)) * 64
+    reads = []
+
+    def entropy_source(n_bytes):
+        reads.append(n_bytes)
+        return entropy_bytes(n_bytes)
+
+    entropy_bytes = util.static_bytes_fn(data)
+    rand_id = Puid(charset=charset, entropy_source=entropy_source, buffer_size=8192)
+    assert rand_id.buffer_size == 8192
+    ids = [rand_id.generate() for _ in range(100)]
+    assert len(reads) == 1
+    assert reads[0] >= 8192
+
+    small_id = Puid(charset=charset, entropy_source=util.static_bytes_fn(data), buffer_size=1)
+    assert [small_id.generate() for _ in range(100)] == ids
+
+
+def test_invalid_buffer_size():
+    with pytest.raises(ValueError):
+        Puid(buffer_size=0)
+
+
+def test_shared_across_threads():
+    # Entropy of consecutive 32-bit counters, so puids sliced from the same bits would repeat
+    lock = threading.Lock()
+    counter = 0
+
+    def entropy_source(n_bytes):
+        nonlocal counter
+        with lock:
+            start, counter = counter, counter + n_bytes // 4
+        return b''.join(count.to_bytes(4, 'big') for count in range(start, start + n_bytes // 4))
+
+    hex_id = Puid(bitwidth=32, charset=Charsets.HEX, entropy_source=entropy_source)
+
+    def generate(_):
+        return [hex_id.generate() for _ in range(5000)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        ids = [id for batch in executor.map(generate, range(8)) for id in batch]
+    assert len(set(ids)) == len(ids)
+
+
+def forked_ids(rand_id: Puid, n_workers: int, n: int) -> list[list[str]]:
+    # puids generated by each of n_workers forked children
+    children = []
+    for _ in range(n_workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # The child must never return into the test session, whatever it raises
+            status = 1
+            try:
+                os.close(read_fd)
+                ids = [rand_id.generate()] + rand_id.generate_many(n - 1)
+                os.write(write_fd, '\n'.join(ids).encode('utf-8'))
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    worker_ids = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, 'rb') as pipe:
+            worker_ids.append(pipe.read().decode('utf-8').split('\n'))
+        assert os.waitpid(pid, 0)[1] == 0
+    return worker_ids
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+@pytest.mark.parametrize("charset", [Charsets.SAFE64, Charsets.ALPHANUM])
+@pytest.mark.parametrize("strategy", ["bits", "integer"])
+@pytest.mark.parametrize("drbg", [False, True])
+def test_fork(charset, strategy, drbg):
+    # Entropy read ahead by the parent is discarded in each child, so no two children repeat it
+    kwargs = {'entropy_source': Drbg()} if drbg else {}
+    rand_id = Puid(bitwidth=64, charset=charset, strategy=strategy, **kwargs)
+    parent_ids = rand_id.generate_many(10)
+    worker_ids = forked_ids(rand_id, 8, 100)
+    assert all(len(ids) == 100 for ids in worker_ids)
+    ids = parent_ids + [id for ids in worker_ids for id in ids] + rand_id.generate_many(10)
+    assert len(set(ids)) == len(ids)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+def test_fork_seeded():
+    # A fixed seed is reproduced in every child
+    rand_id = Puid(entropy_source=Drbg(seed=1))
+    rand_id.generate()
+    worker_ids = forked_ids(rand_id, 2, 10)
+    assert worker_ids[0] == worker_ids[1]
+
+
+def test_munchers_built_on_first_use():
+    rand_id = Puid(charset=Charsets.HEX, track_stats=True)
+    assert 'chars' not in rand_id._munchers.__dict__ and len(rand_id._stats) == 0
+    rand_id.generate()
+    assert 'chars' in rand_id._munchers.__dict__ and len(rand_id._stats) == 1
@@ -0,0 +1,76 @@
+import gc
+import threading
+
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.stats import Stats
+
+
+def test_rejection_stats(util):
+    alpha_lower_bytes = util.fixed_bytes("53 c8 8d e6 3e 27 ef")
+    alpha_lower_id = Puid(bitwidth=14,
+                          charset=Charsets.ALPHA_LOWER,
+                          entropy_source=alpha_lower_bytes,
+                          track_stats=True)
+    assert alpha_lower_id.generate() == "kpe"
+    assert alpha_lower_id.generate_many(2) == ["igh", "ytx"]
+
+    stats = alpha_lower_id.stats()
+    assert stats == Stats(puids=3,
+                          entropy_calls=1,
+                          bits_read=56,
+                          bits_sliced=55,
+                          bits_used=45,
+                          bits_carried=0)
+    assert stats.bits_rejected == 10
+    assert stats.rejection_rate == 10 / 55
+    assert stats.bits_per_puid == 55 / 3
+
+
+def test_pow2_stats(util):
+    hex_bytes = util.fixed_bytes("c7 c9 00 2a bd")
+    hex_id = Puid(bitwidth=12,
+                  charset=Charsets.HEX_UPPER,
+                  entropy_source=hex_bytes,
+                  buffer_size=2,
+                  track_stats=True)
+    assert hex_id.generate_many(3) == ["C7C", "900", "2AB"]
+
+    stats = hex_id.stats()
+    assert stats.puids == 3
+    assert stats.bits_sliced == stats.bits_used == 36
+    assert stats.bits_rejected == 0
+    assert stats.entropy_calls == 2
+
+
+@pytest.mark.parametrize("charset", [Charsets.DECIMAL, Charsets.SAFE_ASCII, Charsets.SAFE32])
+def test_stats_accounting(charset):
+    rand_id = Puid(charset=charset, track_stats=True)
+    for _ in range(100):
+        rand_id.generate()
+    rand_id.generate_many(1000)
+
+    stats = rand_id.stats()
+    assert stats.puids == 1100
+    assert stats.bits_used == 1100 * len(rand_id) * (len(rand_id.charset) - 1).bit_length()
+    assert stats.bits_used <= stats.bits_sliced <= stats.bits_read
+
+
+def test_stats_off():
+    with pytest.raises(ValueError):
+        Puid().stats()
+
+
+def test_stats_of_ended_threads():
+    rand_id = Puid(charset=Charsets.ALPHANUM, track_stats=True)
+    rand_id.generate()
+    for _ in range(20):
+        thread = threading.Thread(target=rand_id.generate_many, args=(10, ))
+        thread.start()
+        thread.join()
+    gc.collect()
+    # Only this thread's stats are kept apart, and none of the ended threads' counts are lost
+    assert len(rand_id._stats) == 1
+    assert rand_id.stats().puids == 201
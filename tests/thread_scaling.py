@@ -0,0 +1,48 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from puid import Charsets
+from puid import Puid
+
+# Throughput of threads sharing a single Puid. Threads only scale on free-threaded CPython
+# (3.13t and later), elsewhere the GIL serializes generation.
+#
+#   python -X gil=0 tests/thread_scaling.py
+
+ids_per_thread = 100_000
+thread_counts = (1, 2, 4, 8)
+
+
+def gil_enabled():
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def ids_per_sec(rand_id, n_threads):
+
+    def generate(_):
+        for _ in range(ids_per_thread):
+            rand_id.generate()
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(generate, range(n_threads)))
+        elapsed = time.perf_counter() - start
+
+    return n_threads * ids_per_thread / elapsed
+
+
+if __name__ == '__main__':
+    print(f'Python {sys.version.split()[0]}, GIL enabled: {gil_enabled()}')
+    for charset in (Charsets.SAFE64, Charsets.ALPHANUM):
+        rand_id = Puid(charset=charset)
+        # Warm up the munchers of the main thread
+        rand_id.generate()
+
+        base_rate = None
+        for n_threads in thread_counts:
+            rate = ids_per_sec(rand_id, n_threads)
+            base_rate = base_rate or rate
+            print(f'{charset.name:>10} {n_threads:>2} threads: {rate:>12,.0f} ids/sec'
+                  f'  ({rate / base_rate:.2f}x)')
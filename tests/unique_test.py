@@ -0,0 +1,83 @@
+import random
+from collections import Counter
+
+import pytest
+
+from puid import Charsets
+from puid import Puid
+from puid.puid_error import UniquenessError
+from puid.unique import BloomFilter, IntSet, UniquePuid
+
+
+def test_int_set():
+    int_set = IntSet(capacity=4)
+    values = random.sample(range(1 << 40), 10_000)
+    assert all(int_set.add(value) for value in values)
+    assert not any(int_set.add(value) for value in values[::7])
+    assert len(int_set) == 10_000
+    assert all(value in int_set for value in values)
+    assert (1 << 40) not in int_set
+    assert 0 not in int_set and int_set.add(0) and 0 in int_set
+
+
+def test_bloom_filter():
+    bloom_filter = BloomFilter(capacity=10_000, false_positive_rate=0.01)
+    values = random.sample(range(1 << 60), 20_000)
+    # Values already reported present are false positives, found as the filter fills up
+    assert 9900 < sum(bloom_filter.add(value) for value in values[:10_000])
+    assert all(value in bloom_filter for value in values[:10_000])
+    # Twice the expected rate leaves ample room
+    assert sum(value in bloom_filter for value in values[10_000:]) < 200
+
+    with pytest.raises(ValueError):
+        BloomFilter(false_positive_rate=0)
+    with pytest.raises(ValueError):
+        BloomFilter(max_bytes=0)
+
+
+@pytest.mark.parametrize("dedupe", ["exact", "bloom"])
+def test_unique_puid(dedupe):
+    rand_id = Puid(bitwidth=20, charset=Charsets.ALPHANUM)
+    unique_id = UniquePuid(rand_id, dedupe=dedupe, capacity=50_000, false_positive_rate=1e-3)
+    ids = unique_id.generate_many(20_000) + [unique_id.generate() for _ in range(1000)]
+    assert len(set(ids)) == len(ids) == len(unique_id)
+    assert rand_id.is_valid_many(ids) == [True] * len(ids)
+    assert all(id in unique_id for id in ids[::10])
+    assert unique_id.generate_many(0) == []
+
+
+def test_unique_puid_exhausted():
+    unique_id = UniquePuid(Puid(bitwidth=4, charset=Charsets.HEX), capacity=4)
+    assert unique_id.add('a')
+    assert not unique_id.add('a')
+    ids = unique_id.generate_many(15)
+    assert sorted(ids + ['a']) == list(Charsets.HEX.value)
+    with pytest.raises(UniquenessError):
+        unique_id.generate()
+
+
+def test_unique_puid_bloom_full():
+    unique_id = UniquePuid(Puid(bitwidth=64), dedupe="bloom", capacity=4, max_bytes=1)
+    with pytest.raises(UniquenessError):
+        unique_id.generate_many(100)
+
+
+def test_unique_puid_large():
+    # Integers of 64 bits or more are kept in a Python set
+    unique_id = UniquePuid(Puid(bitwidth=128))
+    ids = unique_id.generate_many(1000)
+    assert len(set(ids)) == 1000 and all(id in unique_id for id in ids)
+
+
+def test_unique_puid_uniform():
+    # Pairs of distinct puids of 4 are drawn without replacement, so the 12 ordered pairs are
+    # equally likely
+    rand_id = Puid(bitwidth=2, charset="abcd")
+    pairs = Counter(''.join(UniquePuid(rand_id, capacity=2).generate_many(2)) for _ in range(6000))
+    assert len(pairs) == 12
+    assert all(400 < count < 600 for count in pairs.values())
+
+
+def test_invalid_dedupe():
+    with pytest.raises(ValueError):
+        UniquePuid(dedupe="sorted")
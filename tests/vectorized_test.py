@@ -0,0 +1,116 @@
+import random
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from puid import Charsets, Puid
+from puid.bits import value_shifts
+from puid.puid_error import EntropyError
+
+
+@pytest.mark.parametrize("charset", [
+    Charsets.ALPHA,
+    Charsets.ALPHANUM,
+    Charsets.ALPHANUM_LOWER,
+    Charsets.DECIMAL,
+    Charsets.SAFE_ASCII,
+    Charsets.SAFE64,
+    Charsets.HEX,
+    "dîngøsky",
+    "abc",
+    "dîñgø$kyDÎÑGØßK¥z",
+])
+@pytest.mark.parametrize("bitwidth", [9, 64, 128])
+def test_same_ids_as_python(util, charset, bitwidth):
+    entropy = random.Random(bitwidth).randbytes(1 << 17)
+    python_id = Puid(bitwidth=bitwidth, charset=charset, entropy_source=util.static_bytes_fn(entropy))
+    numpy_id = Puid(bitwidth=bitwidth,
+                    charset=charset,
+                    entropy_source=util.static_bytes_fn(entropy),
+                    backend="numpy")
+
+    for _ in range(100):
+        assert numpy_id.generate() == python_id.generate()
+    assert numpy_id.generate_many(2000) == python_id.generate_many(2000)
+
+
+def test_many_blocks(util):
+    # Batches spanning many blocks match single puids sliced from the same entropy
+    entropy = random.Random(1).randbytes(1 << 20)
+    batch_id = Puid(charset=Charsets.ALPHANUM, entropy_source=util.static_bytes_fn(entropy),
+                    backend="numpy")
+    single_id = Puid(charset=Charsets.ALPHANUM, entropy_source=util.static_bytes_fn(entropy),
+                     backend="numpy")
+    ids = batch_id.generate_many(3) + batch_id.generate_many(40_000) + batch_id.generate_many(5)
+    assert ids == [single_id.generate() for _ in range(40_008)]
+
+
+def test_linear_time(monkeypatch):
+    # Small blocks, so a batch takes many of them
+    monkeypatch.setattr("puid.vectorized.BLOCK_LEN", 1 << 10)
+    rand_id = Puid(bitwidth=64, backend="numpy", buffer_size=1 << 10)
+
+    def seconds(n):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            rand_id._munchers.codes(n)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    # Linear growth takes 4 times as long for 4 times the puids, and quadratic growth 16 times
+    assert seconds(1 << 18) < 8 * seconds(1 << 16)
+
+
+def test_value_shifts():
+    assert value_shifts(10) == (4, ) * 10 + (3, 3, 2, 2, 2, 2)
+    assert value_shifts(8) == (3, ) * 8
+
+
+def test_codes_array(util):
+    dingosky_bytes = util.fixed_bytes("c7 c9 00 2a bd 72")
+    dingosky_id = Puid(bitwidth=9, charset="dingosky", entropy_source=dingosky_bytes, backend="numpy")
+    codes = dingosky_id.generate_array(2, kind="codes")
+    assert codes.dtype == np.uint8
+    assert codes.tolist() == [[6, 1, 7], [4, 4, 4]]
+
+
+def test_bytes_array(util):
+    alpha_lower_bytes = util.fixed_bytes("53 c8 8d e6 3e 27 ef")
+    alpha_lower_id = Puid(bitwidth=14,
+                          charset=Charsets.ALPHA_LOWER,
+                          entropy_source=alpha_lower_bytes,
+                          backend="numpy")
+    assert alpha_lower_id.generate_array(3, kind="S").tolist() == [b"kpe", b"igh", b"ytx"]
+
+
+def test_str_array(util):
+    unicode_bytes = util.fixed_bytes('ec f9 db 7a 33 3d 21 97 a0 c2 bf 92 80 dd 2f 57 12 c1 1a ef')
+    unicode_id = Puid(bitwidth=24, charset='dîngøsky:￦', entropy_source=unicode_bytes, backend="numpy")
+    ids = unicode_id.generate_array(3)
+    assert ids.dtype == np.dtype('U8')
+    assert ids.tolist() == ['￦gî￦￦nî￦', 'ydkîsnsd', 'îøsîndøk']
+
+
+def test_invalid_arrays():
+    with pytest.raises(ValueError):
+        Puid(charset="dîngøsky", backend="numpy").generate_array(1, kind="S")
+    with pytest.raises(ValueError):
+        Puid(backend="numpy").generate_array(1, kind="X")
+    with pytest.raises(ValueError):
+        Puid().generate_array(1)
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        Puid(backend="fortran")
+
+
+def test_exhausted_entropy(util):
+    decimal_bytes = util.fixed_bytes("12 34")
+    decimal_id = Puid(bitwidth=13, charset=Charsets.DECIMAL, entropy_source=decimal_bytes, backend="numpy")
+    assert decimal_id.generate() == "1234"
+    with pytest.raises(EntropyError):
+        decimal_id.generate()